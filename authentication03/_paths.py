@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Shared Paillier helpers (obfuscator_pool, primes, paillier_core, ...) live next to the
+# experiment scripts in code/; import this module before importing any of them
+CODE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
+
+if CODE_DIR not in sys.path:
+    sys.path.insert(0, CODE_DIR)
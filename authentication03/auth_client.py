@@ -0,0 +1,146 @@
+import http.client
+import json
+import logging
+import time
+from phe import paillier
+from user import User
+from serialization import int_to_b64, b64_to_int, ciphertext_to_b64, b64_to_ciphertext
+
+
+class AuthClient:
+    """Client for auth_server.py that does the user's side of the protocol locally.
+
+    The user's keypair stays on this machine (``{username}_keys.json``);
+    only the public key, the password hash and ciphertexts cross the wire.
+    One client keeps one HTTP connection alive, so use one per thread.
+    Requests the server turns away as busy (503) are retried with
+    exponential backoff, up to ``busy_retries`` times.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, timeout=30, reservoir=None, busy_retries=6, busy_backoff=0.05):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reservoir = reservoir
+        self.busy_retries = busy_retries
+        self.busy_backoff = busy_backoff
+        self._connection = None
+        self._server_public_key = None
+
+    def _request(self, method, path, payload=None):
+        status, response = self._send(method, path, payload)
+        for attempt in range(self.busy_retries):
+            if status != http.client.SERVICE_UNAVAILABLE:
+                break
+            time.sleep(self.busy_backoff * 2 ** attempt)
+            status, response = self._send(method, path, payload)
+        return status, response
+
+    def _send(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # Retry once on a fresh connection if the server closed the kept-alive one
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                return response.status, json.loads(response.read() or b"{}")
+            except (ConnectionError, http.client.BadStatusLine):
+                self.close()
+                if attempt:
+                    raise
+
+    def server_public_key(self):
+        if self._server_public_key is None:
+            _, payload = self._request("GET", "/public_key")
+            self._server_public_key = paillier.PaillierPublicKey(n=b64_to_int(payload["n"]))
+        return self._server_public_key
+
+    def register(self, username, password):
+        """Register a user; returns (success, message)."""
+        _, payload = self._request("POST", "/check", {"username": username})
+        if payload.get("taken"):
+            return False, f"Username '{username}' is already taken. Please choose a different username."
+
+        user = User(username, password, is_registration=True, reservoir=self.reservoir)
+        status, payload = self._request("POST", "/register", {
+            "username": username,
+            "hashed_password": user.hashed_password,
+            "public_key": int_to_b64(user.public_key.n),
+        })
+        return payload.get("registered", False), payload.get("message", payload.get("error", f"HTTP {status}"))
+
+    def login(self, username, password):
+        """Run the challenge-response login against the server; returns (success, message)."""
+        try:
+            user = User(username, password, is_registration=False)
+        except ValueError as e:
+            return False, str(e)
+
+        status, payload = self._request("POST", "/challenge", {"username": username})
+        if status != http.client.OK:
+            return False, payload.get("error", f"HTTP {status}")
+
+        enc_challenge = b64_to_ciphertext(payload["challenge"], user.public_key)
+        decrypted_challenge = user.decrypt_challenge(enc_challenge)
+        enc_response = user.encrypt_challenge(decrypted_challenge, self.server_public_key())
+        logging.debug(f"Response encrypted by user with server's public key.")
+
+        status, payload = self._request("POST", "/response", {
+            "session_id": payload["session_id"],
+            "response": ciphertext_to_b64(enc_response),
+        })
+        if status != http.client.OK:
+            return False, payload.get("error", f"HTTP {status}")
+        if payload["authenticated"]:
+            return True, f"Login successful for user '{username}'."
+        return False, f"Login failed for user '{username}'. Incorrect password or challenge response."
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def load_test(username, password, logins=200, concurrency=50, host="127.0.0.1", port=8080):
+    """Run many concurrent logins for one registered user; returns (successes, seconds)."""
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    local = threading.local()
+
+    def login(_):
+        if not hasattr(local, "client"):
+            local.client = AuthClient(host, port)
+        return local.client.login(username, password)[0]
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        successes = sum(executor.map(login, range(logins)))
+    return successes, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Client for the HTTP/JSON authentication server")
+    parser.add_argument("command", choices=["register", "login", "load-test"])
+    parser.add_argument("username")
+    parser.add_argument("password")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "load-test":
+        successes, seconds = load_test(args.username, args.password, args.logins, args.concurrency,
+                                       args.host, args.port)
+        print(f"{successes}/{args.logins} logins succeeded in {seconds:.2f} s ({args.logins / seconds:.1f} logins/s)")
+    else:
+        client = AuthClient(args.host, args.port)
+        _, message = getattr(client, args.command)(args.username, args.password)
+        print(message)
+        client.close()
@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import secrets
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from phe import paillier
+from server import Server
+from crypto_pool import PoolBusy
+from key_reservoir import KeyReservoir
+from serialization import int_to_b64, b64_to_int, ciphertext_to_b64, b64_to_ciphertext
+import keystore
+
+# HTTP/JSON endpoints (all POST bodies and responses are JSON; big integers are base64):
+#   GET  /public_key  -> {"n"}
+#   GET  /stats       -> crypto pool and session table statistics
+#   POST /check       {"username"} -> {"taken"}
+#   POST /register    {"username", "hashed_password", "public_key"} -> {"registered", "message"}
+#   POST /challenge   {"username"} -> {"session_id", "challenge", "expires_in"}
+#   POST /response    {"session_id", "response"} -> {"authenticated"}
+MAX_BODY = 64 * 1024
+MAX_HEADERS = 100
+# Registration input checks: users' Paillier moduli and SHA-256 password hashes
+MIN_KEY_BITS = 2048
+HASHED_PASSWORD = re.compile(r"[0-9a-f]{64}")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ChallengeTable:
+    """Pending login challenges by session id, each usable once within ``ttl`` seconds."""
+
+    def __init__(self, ttl=60.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def issue(self, username, challenge):
+        session_id = secrets.token_urlsafe(16)
+        self._sessions[session_id] = (username, challenge, self.clock() + self.ttl)
+        return session_id
+
+    def peek(self, session_id):
+        """Return (username, challenge) without consuming it, or None if unknown or expired."""
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[2] < self.clock():
+            return None
+        return entry[0], entry[1]
+
+    def take(self, session_id):
+        """Remove and return (username, challenge), or None if unknown or expired."""
+        entry = self._sessions.pop(session_id, None)
+        if entry is None or entry[2] < self.clock():
+            return None
+        return entry[0], entry[1]
+
+    def purge(self):
+        now = self.clock()
+        expired = [session_id for session_id, entry in self._sessions.items() if entry[2] < now]
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+
+class AuthServer:
+    """Asyncio HTTP/JSON front end for registration and challenge-response login.
+
+    Any number of logins can be in flight: each challenge lives in the
+    session table rather than on the Server. Database access runs on
+    ``executor``, and Paillier operations go to the server's crypto
+    worker pool when it has one (or the executor otherwise), so the event
+    loop only parses requests and moves bytes. A full crypto pool answers
+    503 so clients back off instead of piling up.
+    """
+
+    def __init__(self, server, host="127.0.0.1", port=8080, challenge_ttl=60.0, executor=None, workers=4):
+        self.server = server
+        self.host = host
+        self.port = port
+        self.challenges = ChallengeTable(challenge_ttl)
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crypto")
+        self._server = None
+        self._purger = None
+        self.routes = {
+            ("GET", "/public_key"): self.handle_public_key,
+            ("GET", "/stats"): self.handle_stats,
+            ("POST", "/check"): self.handle_check,
+            ("POST", "/register"): self.handle_register,
+            ("POST", "/challenge"): self.handle_challenge,
+            ("POST", "/response"): self.handle_response,
+        }
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    @staticmethod
+    def _field(body, name):
+        value = body.get(name)
+        if not isinstance(value, str) or not value:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing field '{name}'")
+        return value
+
+    async def handle_public_key(self, body):
+        return HTTPStatus.OK, {"n": int_to_b64(self.server.public_key.n)}
+
+    async def handle_stats(self, body):
+        pool = self.server.crypto_pool
+        return HTTPStatus.OK, {"pending_challenges": len(self.challenges),
+                               "crypto_pool": pool.stats() if pool is not None else None}
+
+    async def handle_check(self, body):
+        username = self._field(body, "username")
+        return HTTPStatus.OK, {"taken": await self._run(self.server.is_username_taken, username)}
+
+    async def handle_register(self, body):
+        username = self._field(body, "username")
+        hashed_password = self._field(body, "hashed_password")
+        if not HASHED_PASSWORD.fullmatch(hashed_password):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "hashed_password must be a hex SHA-256 digest")
+        try:
+            n = b64_to_int(self._field(body, "public_key"))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "public_key is not valid base64")
+        if n % 2 == 0 or n.bit_length() < MIN_KEY_BITS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"public_key must be an odd modulus of at least {MIN_KEY_BITS} bits")
+        user_public_key = paillier.PaillierPublicKey(n=n)
+        if await self._run(self.server.register_user, username, hashed_password, user_public_key):
+            return HTTPStatus.OK, {"registered": True, "message": f"User '{username}' has been registered successfully."}
+        return HTTPStatus.CONFLICT, {"registered": False, "message": f"Username '{username}' is already taken."}
+
+    async def handle_challenge(self, body):
+        username = self._field(body, "username")
+        user_info = await self._run(self.server.users_db.get, username)
+        if user_info is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"User '{username}' not found. Please register first.")
+        challenge = self.server.generate_challenge()
+        pool = self.server.crypto_pool
+        if pool is not None:
+            ciphertext, _ = await asyncio.wrap_future(pool.submit_encrypt(user_info['public_key'], challenge, block=False))
+        else:
+            ciphertext = await self._run(self.server.encrypt_challenge, challenge, user_info['public_key'])
+        session_id = self.challenges.issue(username, challenge)
+        logging.debug(f"Challenge issued to '{username}' in session {session_id}.")
+        return HTTPStatus.OK, {"session_id": session_id, "challenge": ciphertext_to_b64(ciphertext),
+                               "expires_in": self.challenges.ttl}
+
+    async def handle_response(self, body):
+        session_id = self._field(body, "session_id")
+        if self.challenges.peek(session_id) is None:
+            raise HTTPError(HTTPStatus.GONE, "Unknown or expired session; request a new challenge.")
+        enc_response = b64_to_ciphertext(self._field(body, "response"), self.server.public_key)
+        pool = self.server.crypto_pool
+        # Reserve a pool slot before consuming the session, so a 503 leaves it for the retry
+        decryption = pool.submit_decrypt(enc_response, block=False) if pool is not None else None
+        username, challenge = self.challenges.take(session_id)
+        if decryption is not None:
+            decrypted_sum = await asyncio.wrap_future(decryption)
+            authenticated = await self._run(self.server.check_response, username, decrypted_sum, challenge)
+        else:
+            authenticated = await self._run(self.server.validate_response, username, enc_response, challenge)
+        return HTTPStatus.OK, {"authenticated": authenticated}
+
+    async def _dispatch(self, method, path, raw_body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"No endpoint {method} {path}"}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            if not isinstance(body, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            return await handler(body)
+        except HTTPError as e:
+            return e.status, {"error": e.message}
+        except PoolBusy:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server busy; retry shortly."}
+        except (ValueError, KeyError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception:
+            logging.exception(f"Error handling {method} {path}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+    @staticmethod
+    async def _read_line(reader):
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # Longer than the stream's buffer limit
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request line or header too long")
+
+    async def _read_request(self, reader):
+        request_line = await self._read_line(reader)
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        while True:
+            line = await self._read_line(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many request headers")
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._write_response(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + data)
+        await writer.drain()
+
+    async def _purge_expired(self):
+        while True:
+            await asyncio.sleep(self.challenges.ttl)
+            expired = self.challenges.purge()
+            if expired:
+                logging.debug(f"Expired {expired} unanswered challenges.")
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, backlog=1024)
+        self._purger = asyncio.create_task(self._purge_expired())
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"Authentication server listening on {self.host}:{self.port}.")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._purger is not None:
+            self._purger.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+        if self.server.crypto_pool is not None:
+            self.server.crypto_pool.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler("app.log"), logging.StreamHandler()]
+    )
+    parser = argparse.ArgumentParser(description="HTTP/JSON authentication server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--challenge-ttl", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=4, help="Threads for database access")
+    parser.add_argument("--crypto-workers", type=int, default=None,
+                        help="Processes holding the private key (default: one per core, 0 to disable)")
+    parser.add_argument("--max-pending", type=int, default=None, help="Crypto requests allowed in flight")
+    args = parser.parse_args()
+
+    reservoir = KeyReservoir(spool_dir="key_spool", start=False)
+    server = Server(reservoir, keystore_path=keystore.DEFAULT_PATH)
+    if args.crypto_workers != 0:
+        server.start_crypto_pool(args.crypto_workers, args.max_pending)
+    auth_server = AuthServer(server, args.host, args.port, args.challenge_ttl, workers=args.workers)
+    # Exit normally on SIGTERM so the crypto worker processes are shut down too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        asyncio.run(auth_server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,88 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from server import Server
+from user import User
+from key_reservoir import KeyReservoir
+import _paths  # puts code/ on sys.path
+from obfuscator_pool import get_pool
+import keystore
+
+
+class AuthService:
+    """Long-lived registration and login service.
+
+    Holds one Server (keypair and loaded user database) and an obfuscator
+    pool for the server key for the life of the process, so a login costs
+    only the challenge round trip instead of a new interpreter and server
+    keypair. Calls
+    are serialized because the server keeps the pending challenge as
+    state. ``submit`` runs a call on the service's worker thread.
+    """
+
+    def __init__(self, reservoir=None, key_spool="key_spool", keystore_path=keystore.DEFAULT_PATH):
+        if reservoir is None:
+            # Keypairs come from the spool filled by key_reservoir.py; if it is empty they are generated inline
+            reservoir = KeyReservoir(spool_dir=key_spool, start=False)
+        self.reservoir = reservoir
+        # The server keypair is persisted, so restarts reuse it (rotate with: python keystore.py rotate)
+        self.server = Server(reservoir, keystore_path=keystore_path)
+        # The in-process user encrypts its responses under the server key, so precompute r^n for it
+        self.obfuscator_pool = get_pool(self.server.public_key.n, size=64, low_water=16)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth")
+
+    def register(self, username, password):
+        """Register a user; returns (success, message)."""
+        with self._lock:
+            logging.debug(f"Registration process initiated for username: {username}")
+            if self.server.is_username_taken(username):
+                logging.error(f"Registration failed: Username '{username}' is already taken.")
+                return False, f"Username '{username}' is already taken. Please choose a different username."
+
+            user = User(username, password, is_registration=True, reservoir=self.reservoir)
+            if self.server.register_user(username, user.hashed_password, user.get_public_key()):
+                return True, f"User '{username}' has been registered successfully."
+            return False, f"Registration failed for username '{username}'."
+
+    def login(self, username, password):
+        """Run the encrypted challenge-response login; returns (success, message)."""
+        with self._lock:
+            logging.debug(f"Login process initiated for username: {username}")
+            if username not in self.server.users_db:
+                logging.error(f"User '{username}' not found in database.")
+                return False, f"User '{username}' not found. Please register first."
+
+            logging.info(f"User '{username}' found in database.")
+            try:
+                user = User(username, password, is_registration=False)
+            except ValueError as e:
+                logging.error(str(e))
+                return False, str(e)
+
+            challenge = self.server.generate_challenge()
+            self.server.set_challenge(challenge)
+            logging.debug(f"Challenge generated by server: {challenge}")
+
+            user_public_key_n = self.server.users_db[username]['public_key']
+            enc_challenge = self.server.encrypt_challenge(challenge, user_public_key_n)
+            logging.debug(f"Challenge encrypted using user public key.")
+
+            decrypted_challenge = user.decrypt_challenge(enc_challenge)
+            logging.debug(f"Challenge decrypted by user: {decrypted_challenge}")
+
+            enc_response = user.encrypt_challenge(decrypted_challenge, self.server.public_key, self.obfuscator_pool)
+            logging.debug(f"Response encrypted by user with server's public key.")
+
+            if self.server.validate_response(username, enc_response):
+                logging.info(f"User '{username}' logged in successfully.")
+                return True, f"Login successful for user '{username}'."
+            logging.error(f"Login failed for user '{username}'. Incorrect password or challenge response.")
+            return False, f"Login failed for user '{username}'. Incorrect password or challenge response."
+
+    def submit(self, function, *args):
+        """Run a service call on the worker thread; returns a Future."""
+        return self._executor.submit(function, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
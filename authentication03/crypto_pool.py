@@ -0,0 +1,152 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from phe import paillier
+from keystore import keypair_fields, keypair_from_fields
+
+# Per-worker server keypair, set once by the pool initializer
+_public_key = None
+_private_key = None
+
+
+class PoolBusy(Exception):
+    """Raised when the crypto pool already has max_pending requests in flight."""
+
+
+def _init_worker(fields):
+    global _public_key, _private_key
+    # The CRT constants come precomputed from the parent, so workers start instantly
+    _public_key, _private_key = keypair_from_fields(fields)
+
+def _run_request(request_id, operation, args):
+    started = time.perf_counter_ns()
+    if operation == "decrypt":
+        ciphertext, exponent = args
+        result = _private_key.decrypt(paillier.EncryptedNumber(_public_key, ciphertext, exponent))
+    elif operation == "encrypt":
+        # Encrypt under a user's public key, e.g. a login challenge
+        user_public_key_n, value = args
+        encrypted = paillier.PaillierPublicKey(n=user_public_key_n).encrypt(value)
+        result = (encrypted.ciphertext(be_secure=False), encrypted.exponent)
+    else:
+        raise ValueError(f"Unknown crypto operation '{operation}'")
+    return request_id, os.getpid(), time.perf_counter_ns() - started, result
+
+
+class CryptoWorkerPool:
+    """Worker processes that each hold the server private key.
+
+    Requests carry an increasing request ID and are dispatched to the
+    first free worker, so decryptions run on every core instead of behind
+    the GIL. At most ``max_pending`` requests are in flight: ``submit``
+    blocks (or raises PoolBusy when ``block`` is False) beyond that, which
+    pushes back on callers instead of queueing without bound. ``stats``
+    reports throughput and per-worker busy time and utilization.
+    """
+
+    def __init__(self, public_key, private_key, workers=None, max_pending=None):
+        self.public_key = public_key
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(keypair_fields(public_key, private_key),))
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._worker_stats = {}
+
+    def submit(self, operation, *args, block=True, timeout=None):
+        """Queue a request; returns a Future for its result."""
+        if not self._slots.acquire(blocking=block, timeout=timeout if block else None):
+            with self._lock:
+                self._rejected += 1
+            raise PoolBusy(f"{self.max_pending} crypto requests already in flight")
+        request_id = next(self._request_ids)
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+        try:
+            reply = self._executor.submit(_run_request, request_id, operation, args)
+        except BaseException:
+            self._finish()
+            raise
+        # Callers get a plain Future of the result; the request ID and timing stay in the pool's stats
+        result = Future()
+        result.request_id = request_id
+        reply.add_done_callback(lambda done: self._complete(done, result))
+        return result
+
+    def _finish(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _complete(self, reply, result):
+        self._finish()
+        error = reply.exception() if not reply.cancelled() else RuntimeError("Crypto request cancelled")
+        if error is not None:
+            with self._lock:
+                self._failed += 1
+            logging.error(f"Crypto request {result.request_id} failed: {error}")
+            result.set_exception(error)
+            return
+        _, pid, busy_ns, value = reply.result()
+        with self._lock:
+            self._completed += 1
+            stats = self._worker_stats.setdefault(pid, {"requests": 0, "busy_ns": 0})
+            stats["requests"] += 1
+            stats["busy_ns"] += busy_ns
+        result.set_result(value)
+
+    def submit_decrypt(self, encrypted_number, block=True):
+        return self.submit("decrypt", encrypted_number.ciphertext(be_secure=False), encrypted_number.exponent,
+                           block=block)
+
+    def submit_encrypt(self, user_public_key_n, value, block=True):
+        return self.submit("encrypt", user_public_key_n, value, block=block)
+
+    # Blocking helpers for synchronous callers such as Server
+    def decrypt(self, encrypted_number):
+        return self.submit_decrypt(encrypted_number).result()
+
+    def encrypt(self, user_public_key_n, value):
+        ciphertext, exponent = self.submit_encrypt(user_public_key_n, value).result()
+        return paillier.EncryptedNumber(paillier.PaillierPublicKey(n=user_public_key_n), ciphertext, exponent)
+
+    def stats(self):
+        elapsed_ns = (time.monotonic() - self._started) * 1e9
+        with self._lock:
+            workers = {
+                pid: {"requests": s["requests"], "busy_ms": s["busy_ns"] / 1e6,
+                      "utilization": s["busy_ns"] / elapsed_ns if elapsed_ns else 0.0}
+                for pid, s in self._worker_stats.items()
+            }
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "per_worker": workers,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
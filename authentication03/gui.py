@@ -1,10 +1,18 @@
 import tkinter as tk
 import customtkinter as ctk
-import subprocess
+import logging
 import os
 import time
 import threading
 import re  # Import regex module for password validation
+from auth_service import AuthService
+
+# The service runs in this process, so its log goes straight to the file shown in the Logs window
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.FileHandler("app.log")]
+)
 
 # Configure CustomTkinter appearance
 ctk.set_appearance_mode("dark")
@@ -24,6 +32,60 @@ class App:
         # Log window status
         self.log_window_open = False
 
+        # One authentication service for the whole session, started off the Tk thread
+        self.service = None
+        self.busy = False
+        self.status_label = None
+        threading.Thread(target=self.start_service, daemon=True).start()
+
+    def start_service(self):
+        try:
+            service = AuthService()
+        except Exception as e:
+            logging.error(f"Authentication service failed to start: {e}")
+            self.root.after(0, self.show_floating_message, "Authentication service failed to start.")
+            return
+        self.root.after(0, setattr, self, "service", service)
+
+    def run_in_service(self, method, on_done, *args):
+        # Run a service call on its worker thread and deliver (success, message) back on the Tk thread
+        if self.service is None:
+            self.show_floating_message("Authentication service is starting, please try again shortly.")
+            return
+        if self.busy:
+            self.show_floating_message("A request is already running, please wait.")
+            return
+        self.set_busy(True)
+
+        def deliver(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Authentication request failed: {e}")
+                result = (False, "Request failed. Please try again.")
+            self.root.after(0, self.finish_request, on_done, result)
+
+        self.service.submit(getattr(self.service, method), *args).add_done_callback(deliver)
+
+    def finish_request(self, on_done, result):
+        self.set_busy(False)
+        on_done(*result)
+
+    def set_busy(self, busy):
+        # Grey out the buttons on the current screen and show a status line while a request runs
+        self.busy = busy
+        state = "disabled" if busy else "normal"
+        for widget in self.main_frame.winfo_children():
+            if isinstance(widget, ctk.CTkButton):
+                widget.configure(state=state)
+        if busy:
+            self.status_label = ctk.CTkLabel(self.main_frame, text="Working, please wait...")
+            self.status_label.pack(pady=5)
+        elif self.status_label is not None:
+            if self.status_label.winfo_exists():
+                self.status_label.destroy()
+            self.status_label = None
+
     def create_welcome_screen(self):
         # Clear the main frame for welcome screen components
         for widget in self.main_frame.winfo_children():
@@ -120,31 +182,30 @@ class App:
             return
 
         if username and password:
-            result = subprocess.run(["python", "main.py"], input=f"1\n{username}\n{password}\n3\n", text=True)
-            if result.returncode == 0:
-                self.show_floating_message("User registered successfully.")
-                self.open_login_screen()  # Redirect to login screen after successful registration
-            else:
-                self.show_floating_message("Registration failed. Please try again.")
+            self.run_in_service("register", self.registration_done, username, password)
         else:
             self.show_floating_message("Please fill in both fields.")
 
+    def registration_done(self, success, message):
+        if success:
+            self.show_floating_message("User registered successfully.")
+            self.open_login_screen()  # Redirect to login screen after successful registration
+        else:
+            self.show_floating_message(message)
+
     def login_user(self, username, password):
         if username and password:
-            result = subprocess.run(
-                ["python", "main.py"],
-                input=f"2\n{username}\n{password}\n3\n",
-                text=True,
-                capture_output=True  # Capture output for validation
-            )
-            if result.returncode == 0 and "Login successful" in result.stdout:
-                self.show_floating_message("User logged in successfully.")
-                self.create_dashboard_screen()  # Switch to dashboard on successful login
-            else:
-                self.show_floating_message("Login failed. User not found or incorrect credentials.")
+            self.run_in_service("login", self.login_done, username, password)
         else:
             self.show_floating_message("Please fill in both fields.")
 
+    def login_done(self, success, message):
+        if success:
+            self.show_floating_message("User logged in successfully.")
+            self.create_dashboard_screen()  # Switch to dashboard on successful login
+        else:
+            self.show_floating_message("Login failed. User not found or incorrect credentials.")
+
 
     def show_floating_message(self, message):
         # Create a floating message window
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Crypto.Cipher import AES
+from phe import paillier
+import _paths  # puts code/ on sys.path
+from primes import generate_prime
+
+SPOOL_SUFFIX = ".key"
+SALT_SIZE = 16
+# A claimed entry older than this belongs to a process that died mid-claim
+CLAIM_TIMEOUT = 300
+
+
+def build_keypair(p, q):
+    public_key = paillier.PaillierPublicKey(n=p * q)
+    private_key = paillier.PaillierPrivateKey(public_key, p, q)
+    return public_key, private_key
+
+
+def generate_keypair_parallel(n_length=paillier.DEFAULT_KEYSIZE, executor=None):
+    """Generate a phe keypair, searching for p and q on separate cores."""
+    if executor is None:
+        with ProcessPoolExecutor(2) as own_executor:
+            return generate_keypair_parallel(n_length, own_executor)
+    while True:
+        p_future = executor.submit(generate_prime, n_length // 2)
+        q_future = executor.submit(generate_prime, n_length // 2)
+        p, q = p_future.result(), q_future.result()
+        if p != q:
+            return build_keypair(p, q)
+
+
+class KeyReservoir:
+    """Pool of ready Paillier keypairs, so registration never waits on keygen.
+
+    Keeps ``target`` keypairs per key size. When ``spool_dir`` and a
+    passphrase are given, keypairs are written to the spool encrypted with
+    AES-GCM, so they survive process restarts and are shared between
+    processes; otherwise they are only kept in memory.
+    """
+
+    def __init__(self, key_lengths=(paillier.DEFAULT_KEYSIZE,), target=4, spool_dir=None,
+                 passphrase=None, processes=2, poll_interval=5.0, start=True):
+        self.key_lengths = tuple(key_lengths)
+        self.target = target
+        self.spool_dir = spool_dir
+        self.processes = processes
+        # Other processes drain a shared spool, so the filler also re-checks periodically
+        self.poll_interval = poll_interval
+        self.stalls = 0
+
+        self._memory = {key_length: deque() for key_length in self.key_lengths}
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._cipher_key = None
+        self._created_spool = False
+
+        if spool_dir is not None:
+            if passphrase is None:
+                passphrase = os.environ.get("KEY_SPOOL_PASSPHRASE")
+            if passphrase is None:
+                logging.info("No spool passphrase set; keeping reserved keypairs in memory only.")
+                self.spool_dir = None
+            else:
+                os.makedirs(spool_dir, exist_ok=True)
+                self._cipher_key = self._derive_key(passphrase)
+                if not self._check_key():
+                    logging.error(f"KEY_SPOOL_PASSPHRASE does not match the key spool in {spool_dir}; "
+                                  f"keeping reserved keypairs in memory only.")
+                    self.spool_dir = None
+                    self._cipher_key = None
+                else:
+                    self._recover_claims()
+
+        if start:
+            self.start()
+
+    def _derive_key(self, passphrase):
+        # One random salt per spool, so every process derives the same key
+        salt_path = os.path.join(self.spool_dir, "salt")
+        try:
+            # Exclusive create: if two processes start together, exactly one writes the salt
+            fd = os.open(salt_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            salt = b""
+            # The creator may not have written it yet
+            for _ in range(100):
+                with open(salt_path, 'rb') as f:
+                    salt = f.read()
+                if len(salt) >= SALT_SIZE:
+                    break
+                time.sleep(0.01)
+            if len(salt) != SALT_SIZE:
+                raise ValueError(f"{salt_path} is not a valid spool salt")
+        else:
+            salt = os.urandom(SALT_SIZE)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(salt)
+            self._created_spool = True
+        return hashlib.scrypt(passphrase.encode(), salt=salt, n=2 ** 14, r=8, p=1, dklen=32)
+
+    def _check_key(self):
+        """Compare the derived key with the spool's key-check value, writing it if there is none."""
+        check_path = os.path.join(self.spool_dir, "check")
+        check = hmac.new(self._cipher_key, b"key spool check", hashlib.sha256).digest()
+        # The process that created the salt writes the check value just after it
+        for _ in range(0 if self._created_spool else 100):
+            if os.path.exists(check_path):
+                break
+            time.sleep(0.01)
+        else:
+            # Older spools have no check value yet; the first process to get here records its key
+            tmp_path = f"{check_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(check)
+            try:
+                os.link(tmp_path, check_path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp_path)
+        with open(check_path, 'rb') as f:
+            return hmac.compare_digest(f.read(), check)
+
+    def _recover_claims(self):
+        # Return entries claimed by a process that died before it decrypted them
+        now = time.time()
+        for name in os.listdir(self.spool_dir):
+            if not name.endswith(".claimed"):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if now - os.path.getmtime(path) < CLAIM_TIMEOUT:
+                    continue
+                os.rename(path, os.path.join(self.spool_dir, name.rsplit(".", 2)[0]))
+            except FileNotFoundError:
+                continue
+            logging.info(f"Returned stale claimed keypair {name} to the spool.")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._fill, daemon=True)
+            self._thread.start()
+            self._refill.set()
+
+    def close(self):
+        self._stopped.set()
+        self._refill.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # Spool entries are <key_length>_<fingerprint>.key: nonce | tag | AES-GCM ciphertext
+    def _spool_entries(self, key_length):
+        prefix = f"{key_length}_"
+        return sorted(name for name in os.listdir(self.spool_dir)
+                      if name.startswith(prefix) and name.endswith(SPOOL_SUFFIX))
+
+    def available(self, key_length):
+        if self.spool_dir is not None:
+            return len(self._spool_entries(key_length))
+        return len(self._memory[key_length])
+
+    def _store(self, key_length, keypair):
+        if self.spool_dir is None:
+            with self._lock:
+                self._memory[key_length].append(keypair)
+            return
+        public_key, private_key = keypair
+        fingerprint = hashlib.sha256(str(public_key.n).encode()).hexdigest()[:16]
+        plaintext = json.dumps({'p': private_key.p, 'q': private_key.q}).encode()
+        cipher = AES.new(self._cipher_key, AES.MODE_GCM)
+        ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+        path = os.path.join(self.spool_dir, f"{key_length}_{fingerprint}{SPOOL_SUFFIX}")
+        # Write under a temporary name so readers never see a partial file
+        with open(path + ".tmp", 'wb') as f:
+            f.write(cipher.nonce + tag + ciphertext)
+        os.replace(path + ".tmp", path)
+
+    def _claim(self, key_length):
+        if self.spool_dir is None:
+            with self._lock:
+                queue = self._memory.get(key_length)
+                return queue.popleft() if queue else None
+        for name in self._spool_entries(key_length):
+            path = os.path.join(self.spool_dir, name)
+            claimed_path = f"{path}.{os.getpid()}.claimed"
+            try:
+                # rename is atomic, so only one process can claim each entry
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                continue
+            with open(claimed_path, 'rb') as f:
+                data = f.read()
+            try:
+                cipher = AES.new(self._cipher_key, AES.MODE_GCM, nonce=data[:16])
+                keys = json.loads(cipher.decrypt_and_verify(data[32:], data[16:32]))
+                keypair = build_keypair(keys['p'], keys['q'])
+            except (ValueError, KeyError, TypeError) as e:
+                # Wrong passphrase or a damaged entry: set it aside rather than lose it
+                os.replace(claimed_path, path + ".bad")
+                logging.error(f"Could not decrypt spooled keypair {name} ({e}); moved it to {name}.bad.")
+                continue
+            os.remove(claimed_path)
+            return keypair
+        return None
+
+    def _fill(self):
+        with ProcessPoolExecutor(self.processes) as executor:
+            while not self._stopped.is_set():
+                self._refill.wait(self.poll_interval)
+                self._refill.clear()
+                if self.spool_dir is not None:
+                    self._recover_claims()
+                for key_length in self.key_lengths:
+                    while not self._stopped.is_set() and self.available(key_length) < self.target:
+                        self._store(key_length, generate_keypair_parallel(key_length, executor))
+                        logging.debug(f"Reserved a new {key_length}-bit Paillier keypair.")
+
+    def take(self, key_length=paillier.DEFAULT_KEYSIZE):
+        """Take a ready keypair, generating one inline if the reservoir has none it can use."""
+        keypair = self._claim(key_length)
+        self._refill.set()
+        if keypair is None:
+            self.stalls += 1
+            logging.debug(f"Key reservoir empty for {key_length} bits; generating inline.")
+            keypair = paillier.generate_paillier_keypair(n_length=key_length)
+        return keypair
+
+
+if __name__ == "__main__":
+    # Long-running filler for the shared spool used by main.py
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    reservoir = KeyReservoir(target=target, spool_dir="key_spool", start=False)
+    if reservoir.spool_dir is None:
+        sys.exit("Set KEY_SPOOL_PASSPHRASE to fill the key spool.")
+    reservoir.start()
+    try:
+        while True:
+            time.sleep(60)
+            logging.info(f"Key spool holds {reservoir.available(paillier.DEFAULT_KEYSIZE)} keypairs.")
+    except KeyboardInterrupt:
+        reservoir.close()
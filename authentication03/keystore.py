@@ -0,0 +1,160 @@
+import argparse
+import hashlib
+import logging
+import os
+import struct
+import sys
+from Crypto.Cipher import AES
+from phe import paillier
+
+# Binary keystore for the server's Paillier keypair (integers big-endian):
+#   header: magic, version, flags, field count
+#   payload: for each field a 4-byte length and the integer's bytes, in FIELDS order
+#   trailer: SHA-256 of header and payload
+# With FLAG_ENCRYPTED the payload is salt | nonce | tag | AES-GCM(payload), keyed
+# by scrypt of the passphrase. The CRT constants are stored with the primes, so
+# loading needs no modular exponentiation at all.
+MAGIC = b"PKKS"
+VERSION = 1
+FLAG_ENCRYPTED = 1
+HEADER = struct.Struct(">4sHHI")
+LENGTH = struct.Struct(">I")
+FIELDS = ("n", "p", "q", "psquare", "qsquare", "p_inverse", "hp", "hq")
+DEFAULT_PATH = "server_key.bin"
+
+
+def _derive_key(passphrase, salt):
+    return hashlib.scrypt(passphrase.encode(), salt=salt, n=2 ** 14, r=8, p=1, dklen=32)
+
+def _encode_fields(values):
+    parts = []
+    for value in values:
+        data = value.to_bytes((value.bit_length() + 7) // 8 or 1, 'big')
+        parts.append(LENGTH.pack(len(data)) + data)
+    return b"".join(parts)
+
+def _decode_fields(payload, count):
+    values = []
+    offset = 0
+    for _ in range(count):
+        (length,) = LENGTH.unpack_from(payload, offset)
+        offset += LENGTH.size
+        values.append(int.from_bytes(payload[offset:offset + length], 'big'))
+        offset += length
+    if offset != len(payload):
+        raise ValueError("Keystore payload has trailing data")
+    return values
+
+
+def save_keypair(path, public_key, private_key, passphrase=None):
+    if passphrase is None:
+        passphrase = os.environ.get("SERVER_KEY_PASSPHRASE")
+    payload = _encode_fields(keypair_fields(public_key, private_key))
+    flags = 0
+    if passphrase:
+        flags |= FLAG_ENCRYPTED
+        salt = os.urandom(16)
+        cipher = AES.new(_derive_key(passphrase, salt), AES.MODE_GCM)
+        ciphertext, tag = cipher.encrypt_and_digest(payload)
+        payload = salt + cipher.nonce + tag + ciphertext
+    else:
+        logging.info("No SERVER_KEY_PASSPHRASE set; the server key is stored unencrypted (owner-only permissions).")
+
+    body = HEADER.pack(MAGIC, VERSION, flags, len(FIELDS)) + payload
+    # Write under a temporary name with owner-only permissions, then swap it in
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(body + hashlib.sha256(body).digest())
+    os.replace(tmp_path, path)
+    logging.info(f"Server keypair ({public_key.n.bit_length()} bits) saved to {path}.")
+
+def load_keypair(path, passphrase=None):
+    """Load (public_key, private_key) as phe keys without recomputing the CRT constants."""
+    if passphrase is None:
+        passphrase = os.environ.get("SERVER_KEY_PASSPHRASE")
+    with open(path, 'rb') as f:
+        data = f.read()
+    body, digest = data[:-32], data[-32:]
+    if len(data) < HEADER.size + 32 or hashlib.sha256(body).digest() != digest:
+        raise ValueError(f"{path} is corrupt or not a keystore")
+    magic, version, flags, count = HEADER.unpack_from(body, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a keystore")
+    if version != VERSION or count != len(FIELDS):
+        raise ValueError(f"Unsupported keystore version {version}")
+
+    payload = body[HEADER.size:]
+    if flags & FLAG_ENCRYPTED:
+        if not passphrase:
+            raise ValueError(f"{path} is encrypted; set SERVER_KEY_PASSPHRASE")
+        salt, nonce, tag = payload[:16], payload[16:32], payload[32:48]
+        cipher = AES.new(_derive_key(passphrase, salt), AES.MODE_GCM, nonce=nonce)
+        payload = cipher.decrypt_and_verify(payload[48:], tag)
+
+    values = _decode_fields(payload, count)
+    if values[1] * values[2] != values[0]:
+        raise ValueError(f"{path} holds an inconsistent keypair")
+    return keypair_from_fields(values)
+
+
+# The keypair as plain integers in FIELDS order, e.g. to hand to worker processes
+def keypair_fields(public_key, private_key):
+    return [public_key.n] + [getattr(private_key, field) for field in FIELDS[1:]]
+
+def keypair_from_fields(values):
+    values = dict(zip(FIELDS, values))
+    public_key = paillier.PaillierPublicKey(n=values["n"])
+    # Bypass PaillierPrivateKey.__init__, which would recompute hp and hq
+    private_key = paillier.PaillierPrivateKey.__new__(paillier.PaillierPrivateKey)
+    private_key.public_key = public_key
+    for field in FIELDS[1:]:
+        setattr(private_key, field, values[field])
+    return public_key, private_key
+
+
+def load_or_create(path=DEFAULT_PATH, reservoir=None, key_length=paillier.DEFAULT_KEYSIZE):
+    """Warm start from the keystore; generate and persist a keypair only on first run."""
+    if os.path.exists(path):
+        keypair = load_keypair(path)
+        logging.debug(f"Server keypair loaded from {path}.")
+        return keypair
+    keypair = _new_keypair(reservoir, key_length)
+    save_keypair(path, *keypair)
+    return keypair
+
+def _new_keypair(reservoir, key_length):
+    if reservoir is not None:
+        return reservoir.take(key_length)
+    return paillier.generate_paillier_keypair(n_length=key_length)
+
+def rotate(path=DEFAULT_PATH, reservoir=None, key_length=paillier.DEFAULT_KEYSIZE):
+    """Replace the stored keypair, keeping the previous one as <path>.prev.
+
+    Challenges issued under the old key can no longer be validated, so
+    rotate while no logins are in flight.
+    """
+    keypair = _new_keypair(reservoir, key_length)
+    if os.path.exists(path):
+        os.replace(path, path + ".prev")
+    save_keypair(path, *keypair)
+    logging.info(f"Server keypair rotated; previous key kept at {path}.prev.")
+    return keypair
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Manage the server's persisted Paillier keypair")
+    parser.add_argument("command", choices=["rotate", "show"])
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--bits", type=int, default=paillier.DEFAULT_KEYSIZE)
+    args = parser.parse_args()
+
+    if args.command == "rotate":
+        public_key, _ = rotate(args.path, key_length=args.bits)
+    else:
+        if not os.path.exists(args.path):
+            sys.exit(f"No keystore at {args.path}")
+        public_key, _ = load_keypair(args.path)
+    fingerprint = hashlib.sha256(str(public_key.n).encode()).hexdigest()[:16]
+    print(f"{args.path}: {public_key.n.bit_length()}-bit key, fingerprint {fingerprint}")
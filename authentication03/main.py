@@ -1,6 +1,5 @@
 import logging
-from server import Server
-from user import User
+from auth_service import AuthService
 
 # Set up logging to file
 logging.basicConfig(
@@ -13,8 +12,8 @@ logging.basicConfig(
 )
 
 def main():
-    # Initialize the server
-    server = Server()
+    # One service for the whole session: the server keypair and user database are loaded once
+    service = AuthService()
 
     while True:
         print("\n1. Register")
@@ -26,55 +25,19 @@ def main():
             # Registration
             username = input("Enter username for registration: ")
             password = input("Enter password for registration: ")
-            logging.debug(f"Registration process initiated for username: {username}")
-
-            if server.is_username_taken(username):
-                print(f"Username '{username}' is already taken. Please choose a different username.")
-                logging.error(f"Registration failed: Username '{username}' is already taken.")
-            else:
-                user = User(username, password, is_registration=True)
-                if server.register_user(username, user.hashed_password, user.get_public_key()):
-                    print(f"User '{username}' has been registered successfully.")
-                else:
-                    print(f"Registration failed for username '{username}'.")
+            _, message = service.register(username, password)
+            print(message)
 
         elif choice == "2":
             # Login process
             username = input("Enter your username: ")
             password = input("Enter your password: ")
-            logging.debug(f"Login process initiated for username: {username}")
-
-            if username in server.users_db:
-                logging.info(f"User '{username}' found in database.")
-                user = User(username, password, is_registration=False)
-                challenge = server.generate_challenge()
-                server.set_challenge(challenge)
-                logging.debug(f"Challenge generated by server: {challenge}")
-
-                user_public_key_n = server.users_db[username]['public_key']
-                enc_challenge = server.encrypt_challenge(challenge, user_public_key_n)
-                logging.debug(f"Challenge encrypted using user public key.")
-
-                decrypted_challenge = user.decrypt_challenge(enc_challenge)
-                logging.debug(f"Challenge decrypted by user: {decrypted_challenge}")
-
-                enc_response = user.encrypt_challenge(decrypted_challenge, server.public_key)
-                logging.debug(f"Response encrypted by user with server's public key.")
-
-                is_authenticated = server.validate_response(username, enc_response)
-
-                if is_authenticated:
-                    print(f"Login successful for user '{username}'.")
-                    logging.info(f"User '{username}' logged in successfully.")
-                else:
-                    print(f"Login failed for user '{username}'. Incorrect password or challenge response.")
-                    logging.error(f"Login failed for user '{username}'. Incorrect password or challenge response.")
-            else:
-                print(f"User '{username}' not found. Please register first.")
-                logging.error(f"User '{username}' not found in database.")
+            _, message = service.login(username, password)
+            print(message)
 
         elif choice == "3":
             logging.info("Exiting program.")
+            service.close()
             break
 
         else:
@@ -0,0 +1,125 @@
+import base64
+import glob
+import json
+import logging
+import os
+
+# Large integers (moduli, primes, ciphertexts) are stored as base64 of their
+# big-endian bytes rather than as decimal digits: decimal parsing is
+# quadratic in CPython and long values run into sys.int_max_str_digits.
+# Every file written here carries a format tag and version; files without
+# one are the original decimal JSON and are still read.
+FORMAT = "paillier-b64"
+VERSION = 1
+
+
+def int_to_b64(value):
+    return base64.b64encode(value.to_bytes((value.bit_length() + 7) // 8 or 1, 'big')).decode('ascii')
+
+def b64_to_int(text):
+    # validate=True rejects stray characters instead of silently dropping them
+    return int.from_bytes(base64.b64decode(text, validate=True), 'big')
+
+# Ciphertexts use the same encoding; phe EncryptedNumbers are unwrapped without re-obfuscating
+def ciphertext_to_b64(ciphertext):
+    if hasattr(ciphertext, 'ciphertext'):
+        ciphertext = ciphertext.ciphertext(be_secure=False)
+    return int_to_b64(ciphertext)
+
+def b64_to_ciphertext(text, public_key=None):
+    value = b64_to_int(text)
+    if public_key is None:
+        return value
+    from phe import paillier
+    return paillier.EncryptedNumber(public_key, value)
+
+
+def _header():
+    return {'format': FORMAT, 'version': VERSION}
+
+def _check_header(data, path):
+    """True for a versioned file, False for a legacy decimal one."""
+    if data.get('format') != FORMAT:
+        return False
+    if data.get('version') != VERSION:
+        raise ValueError(f"{path}: unsupported {FORMAT} version {data.get('version')}")
+    return True
+
+def _write_json(path, data):
+    # Write to a temporary file first so an interrupted save never truncates the original
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+# Keypair files: {username}_keys.json
+def dump_keypair(path, n, p, q):
+    data = _header()
+    data.update({'public_key': int_to_b64(n), 'private_key_p': int_to_b64(p), 'private_key_q': int_to_b64(q)})
+    _write_json(path, data)
+
+def load_keypair(path):
+    """Return (n, p, q) from a keypair file in either format."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    decode = b64_to_int if _check_header(data, path) else int
+    return decode(data['public_key']), decode(data['private_key_p']), decode(data['private_key_q'])
+
+
+# User database: username -> {'hashed_password': hex digest, 'public_key': n}
+def dump_users_db(path, users_db):
+    data = _header()
+    data['users'] = {
+        username: {'hashed_password': info['hashed_password'], 'public_key': int_to_b64(info['public_key'])}
+        for username, info in users_db.items()
+    }
+    _write_json(path, data)
+
+def load_users_db(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if _check_header(data, path):
+        users = data['users']
+        decode = b64_to_int
+    else:
+        users = data
+        decode = int
+    return {
+        username: {'hashed_password': info['hashed_password'], 'public_key': decode(info['public_key'])}
+        for username, info in users.items()
+    }
+
+
+def migrate(directory="."):
+    """One-shot rewrite of users_db.json, public_keys.json and *_keys.json into the compact format.
+
+    Files that are already versioned are left alone. Returns the migrated paths.
+    """
+    migrated = []
+    users_db_path = os.path.join(directory, "users_db.json")
+    if os.path.exists(users_db_path):
+        with open(users_db_path, 'r') as f:
+            is_current = _check_header(json.load(f), users_db_path)
+        if not is_current:
+            dump_users_db(users_db_path, load_users_db(users_db_path))
+            migrated.append(users_db_path)
+
+    # public_keys.json has the same layout as the per-user keypair files
+    for path in sorted(glob.glob(os.path.join(directory, "*_keys.json"))):
+        with open(path, 'r') as f:
+            is_current = _check_header(json.load(f), path)
+        if not is_current:
+            dump_keypair(path, *load_keypair(path))
+            migrated.append(path)
+
+    for path in migrated:
+        logging.info(f"Migrated {path} to {FORMAT} v{VERSION}.")
+    return migrated
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    for path in migrate(sys.argv[1] if len(sys.argv) > 1 else "."):
+        print(f"Migrated {path}")
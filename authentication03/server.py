@@ -1,49 +1,55 @@
-import os
 import random
-import json
 import logging
 from phe import paillier
+from serialization import dump_users_db
+from user_store import UserStore
+from crypto_pool import CryptoWorkerPool
+import keystore
 
 class Server:
-    def __init__(self):
-        # Generate Paillier keypair for the server
-        self.public_key, self.private_key = paillier.generate_paillier_keypair()
-        self.users_db_path = "users_db.json"
+    def __init__(self, reservoir=None, keystore_path=None):
+        # Load the persisted keypair when a keystore is used; otherwise generate one,
+        # or take a ready one from the reservoir
+        if keystore_path is not None:
+            self.public_key, self.private_key = keystore.load_or_create(keystore_path, reservoir)
+        elif reservoir is not None:
+            self.public_key, self.private_key = reservoir.take()
+        else:
+            self.public_key, self.private_key = paillier.generate_paillier_keypair()
+
+        self.users_db_path = "users.db"
+        self.legacy_users_db_path = "users_db.json"
 
-        # Load the users' database, create it if it doesn't exist
+        # Open the users' database, create it if it doesn't exist
         self.users_db = self.load_or_create_users_db()
 
-    def load_or_create_users_db(self):
-        # Create the JSON file if it doesn't exist
-        if not os.path.exists(self.users_db_path):
-            with open(self.users_db_path, 'w') as f:
-                json.dump({}, f)  # Initialize with an empty dictionary
-            logging.info("User database created.")
+        # Worker processes holding the private key, once start_crypto_pool() is called
+        self.crypto_pool = None
 
-        # Load existing user data
-        with open(self.users_db_path, 'r') as f:
-            return json.load(f)
+    def start_crypto_pool(self, workers=None, max_pending=None):
+        if self.crypto_pool is None:
+            self.crypto_pool = CryptoWorkerPool(self.public_key, self.private_key, workers, max_pending)
+        return self.crypto_pool
+
+    def load_or_create_users_db(self):
+        # SQLite store, seeded once from the old JSON file if there is one
+        return UserStore(self.users_db_path, legacy_json_path=self.legacy_users_db_path)
 
     def save_users_db(self):
-        # Save the users' database to JSON
-        with open(self.users_db_path, 'w') as f:
-            json.dump(self.users_db, f, indent=4)
-        logging.debug("User database saved.")
+        # Each registration is committed as it is written; this exports a JSON snapshot
+        dump_users_db(self.legacy_users_db_path, dict(self.users_db.items()))
+        logging.debug("User database exported.")
 
     def is_username_taken(self, username):
         # Check if the username is already registered
         return username in self.users_db
 
     def register_user(self, username, hashed_password, user_public_key):
-        if self.is_username_taken(username):
+        # Store the user's hashed password and the n value of their public key;
+        # the insert fails if another process registered the name first
+        if not self.users_db.add(username, hashed_password, user_public_key.n):
             logging.error(f"Username '{username}' is already taken.")
             return False
-        # Store the user's hashed password and public key
-        self.users_db[username] = {
-            'hashed_password': hashed_password,
-            'public_key': user_public_key.n  # Store the n value of the public key
-        }
-        self.save_users_db()
         logging.info(f"User '{username}' registered successfully with hashed password and public key.")
         return True
 
@@ -53,6 +59,8 @@ class Server:
         return challenge
 
     def encrypt_challenge(self, challenge, user_public_key_n):
+        if self.crypto_pool is not None:
+            return self.crypto_pool.encrypt(user_public_key_n, challenge)
         # Create PaillierPublicKey from the integer stored in the database
         user_public_key = paillier.PaillierPublicKey(n=user_public_key_n)
         return user_public_key.encrypt(challenge)
@@ -60,17 +68,26 @@ class Server:
     def set_challenge(self, challenge):
         self.challenge = challenge
 
-    def validate_response(self, username, enc_response):
+    def validate_response(self, username, enc_response, challenge=None):
+        # The challenge defaults to the one set for the single in-process login
+        if challenge is None:
+            challenge = self.challenge
+
+        # Decrypt the response using the server's private key, in a worker process if there is a pool
+        if self.crypto_pool is not None:
+            decrypted_sum = self.crypto_pool.decrypt(enc_response)
+        else:
+            decrypted_sum = self.private_key.decrypt(enc_response)
+        logging.debug(f"Server decrypted the response: {decrypted_sum}")
+        return self.check_response(username, decrypted_sum, challenge)
+
+    def check_response(self, username, decrypted_sum, challenge):
         # Retrieve user's information
         user_info = self.users_db[username]
         stored_hashed_password = int(user_info['hashed_password'], 16)
 
-        # Decrypt the response using the server's private key
-        decrypted_sum = self.private_key.decrypt(enc_response)
-        logging.debug(f"Server decrypted the response: {decrypted_sum}")
-
         # Validate the response
-        if decrypted_sum == self.challenge + stored_hashed_password:
+        if decrypted_sum == challenge + stored_hashed_password:
             logging.info(f"Login successful for user: {username}")
             return True
         else:
@@ -0,0 +1,117 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from serialization import load_users_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    hashed_password TEXT NOT NULL,
+    public_key BLOB NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def _key_to_blob(n):
+    return n.to_bytes((n.bit_length() + 7) // 8 or 1, 'big')
+
+
+class UserStore:
+    """SQLite-backed user database with the dict access the server already uses.
+
+    ``store[username]`` returns ``{'hashed_password': ..., 'public_key': n}``
+    and ``username in store`` is an indexed lookup, so a registration
+    writes one row instead of rewriting every user. The database runs in
+    WAL mode, so readers in other processes never block the writer, and
+    ``add`` is an atomic check-and-insert, so two processes cannot both
+    claim a username. Writes inside ``batch()`` share one transaction.
+    """
+
+    def __init__(self, path="users.db", legacy_json_path=None):
+        self.path = path
+        # One connection shared by this process's threads, serialized by the lock
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(SCHEMA)
+        if legacy_json_path is not None and os.path.exists(legacy_json_path) and len(self) == 0:
+            self._import_json(legacy_json_path)
+
+    def _import_json(self, path):
+        users = load_users_db(path)
+        self.add_many((username, info['hashed_password'], info['public_key']) for username, info in users.items())
+        logging.info(f"Imported {len(users)} users from {path} into {self.path}.")
+
+    def _execute(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters)
+
+    @contextmanager
+    def batch(self):
+        """Group writes into a single transaction, committed when the outermost batch exits."""
+        with self._lock:
+            if self._batch_depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._connection.execute("COMMIT")
+
+    def add(self, username, hashed_password, public_key_n):
+        """Insert a user; False if the username is already taken."""
+        try:
+            self._execute("INSERT INTO users (username, hashed_password, public_key) VALUES (?, ?, ?)",
+                          (username, hashed_password, _key_to_blob(public_key_n)))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def add_many(self, users):
+        """Insert (username, hashed_password, n) rows in one transaction, skipping taken names."""
+        rows = [(username, hashed_password, _key_to_blob(n)) for username, hashed_password, n in users]
+        with self.batch():
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO users (username, hashed_password, public_key) VALUES (?, ?, ?)", rows)
+
+    def __contains__(self, username):
+        return self._execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is not None
+
+    def __getitem__(self, username):
+        row = self._execute("SELECT hashed_password, public_key FROM users WHERE username = ?",
+                            (username,)).fetchone()
+        if row is None:
+            raise KeyError(username)
+        return {'hashed_password': row[0], 'public_key': int.from_bytes(row[1], 'big')}
+
+    def get(self, username, default=None):
+        try:
+            return self[username]
+        except KeyError:
+            return default
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def __iter__(self):
+        return iter([row[0] for row in self._execute("SELECT username FROM users ORDER BY username")])
+
+    def items(self):
+        rows = self._execute("SELECT username, hashed_password, public_key FROM users ORDER BY username").fetchall()
+        return [(username, {'hashed_password': hashed, 'public_key': int.from_bytes(key, 'big')})
+                for username, hashed, key in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,98 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from bigint_backend import mulmod
+from paillier_core import decrypt
+from ciphertext_file import CiphertextReader
+
+# Per-worker modulus, set once by the pool initializer
+_n_sq = None
+
+def _init_worker(n_sq):
+    global _n_sq
+    _n_sq = n_sq
+
+# Multiply a run of ciphertexts together, i.e. add their plaintexts
+def product_mod(ciphertexts, n_sq):
+    product = 1
+    for ciphertext in ciphertexts:
+        product = mulmod(product, ciphertext, n_sq)
+    return product
+
+def _reduce_chunk(ciphertexts):
+    return product_mod(ciphertexts, _n_sq)
+
+def _reduce_file_range(task):
+    path, start, stop = task
+    with CiphertextReader(path) as reader:
+        return product_mod((int.from_bytes(r, 'big') for r in reader.scan_records(start, stop)), _n_sq)
+
+
+class EncryptedAggregate:
+    """Encrypted SUM of a set of readings together with their COUNT."""
+
+    def __init__(self, sum_ciphertext, count):
+        self.sum_ciphertext = sum_ciphertext
+        self.count = count
+
+    def total(self, private_key, public_key=None):
+        return decrypt(self.sum_ciphertext, private_key, public_key)
+
+    # One decryption for the mean of every reading in the aggregate
+    def mean(self, private_key, public_key=None):
+        if self.count == 0:
+            return None
+        return self.total(private_key, public_key) / self.count
+
+
+class AggregationEngine:
+    """Homomorphic SUM/COUNT/MEAN over many ciphertexts.
+
+    Ciphertexts are multiplied together within chunks on a process pool,
+    and the partial products are then combined in this process, so the
+    whole set needs a single decryption at the end.
+    """
+
+    def __init__(self, public_key, workers=None, chunk_size=65536):
+        n, _ = public_key
+        self.public_key = public_key
+        self.n_sq = n * n
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def _executor(self):
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.n_sq,))
+
+    def _combine(self, partials):
+        # One partial per chunk: a multiplication each is cheaper here than a round trip to a worker
+        return product_mod(partials, self.n_sq)
+
+    def aggregate(self, ciphertexts):
+        """Aggregate an iterable or stream of ciphertexts."""
+        iterator = iter(ciphertexts)
+        count = 0
+        partials = []
+        with self._executor() as executor:
+            pending = deque()
+            while True:
+                chunk = list(islice(iterator, self.chunk_size))
+                if not chunk:
+                    break
+                count += len(chunk)
+                pending.append(executor.submit(_reduce_chunk, chunk))
+                # Bound the chunks in flight so a long stream is never held in memory
+                if len(pending) >= 2 * self.workers:
+                    partials.append(pending.popleft().result())
+            partials.extend(future.result() for future in pending)
+            return EncryptedAggregate(self._combine(partials), count)
+
+    def aggregate_file(self, path):
+        """Aggregate a ciphertext file; each worker maps and scans its own range."""
+        with CiphertextReader(path) as reader:
+            reader.check_key(self.public_key)
+            count = len(reader)
+        tasks = [(path, start, min(start + self.chunk_size, count)) for start in range(0, count, self.chunk_size)]
+        with self._executor() as executor:
+            partials = list(executor.map(_reduce_file_range, tasks))
+            return EncryptedAggregate(self._combine(partials), count)
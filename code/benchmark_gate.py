@@ -0,0 +1,157 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import bigint_backend
+from benchmark_suite import build_parser, run_from_args, settings_from_args, write_json
+
+# Named baselines live next to the scripts so they can be kept out of or in version control as wanted
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines")
+# Throughput-critical operations that fail the gate; everything else is reported only
+GATED_OPERATIONS = ("encrypt", "decrypt", "compare", "classify_batch")
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 2
+
+
+def baseline_path(name, directory=BASELINE_DIR):
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+", name):
+        raise ValueError(f"Invalid baseline name '{name}'")
+    return os.path.join(directory, f"{name}.json")
+
+def save_baseline(name, results, settings, directory=BASELINE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = baseline_path(name, directory)
+    write_json(results, path, settings)
+    return path
+
+def load_baseline(name, directory=BASELINE_DIR):
+    with open(baseline_path(name, directory), 'r') as f:
+        return json.load(f)
+
+def list_baselines(directory=BASELINE_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+
+
+def compare(baseline, current, tolerance=0.25, noise_sigmas=3.0, gated=GATED_OPERATIONS, max_noise=0.5):
+    """Compare two result lists operation by operation.
+
+    A gated operation regresses when its median slows down by more than
+    ``tolerance`` (a fraction of the baseline median) and by more than the
+    baseline's noise: ``noise_sigmas`` standard errors of the difference
+    of medians, estimated from the baseline's median absolute deviation,
+    or the baseline's p95 - median spread if larger. The noise allowance
+    comes from the baseline only, so outliers in the run being checked
+    cannot hide a slowdown, and is capped at ``max_noise`` of the baseline
+    median. Operations in the baseline but missing from the current run
+    are reported as MISSING. Returns rows of
+    (scheme, bits, operation, baseline ns, current ns, change, status).
+    """
+    previous = {(row["scheme"], row["bits"], row["operation"]): row for row in baseline}
+    rows = []
+    for row in current:
+        key = (row["scheme"], row["bits"], row["operation"])
+        base = previous.pop(key, None)
+        if base is None:
+            rows.append(key + (None, row["median_ns"], None, "new"))
+            continue
+        delta = row["median_ns"] - base["median_ns"]
+        change = delta / base["median_ns"] if base["median_ns"] else 0.0
+        # 1.4826 * MAD estimates the standard deviation; baselines saved before MAD was recorded use stddev
+        sigma = 1.4826 * base["mad_ns"] if "mad_ns" in base else base["stddev_ns"]
+        # Standard error of a median is about 1.25 * sigma / sqrt(n)
+        noise = noise_sigmas * 1.25 * sigma * math.sqrt(1 / base["iterations"] + 1 / row["iterations"])
+        spread = base["p95_ns"] - base["median_ns"]
+        allowance = max(tolerance * base["median_ns"], min(max(noise, spread), max_noise * base["median_ns"]))
+        if abs(delta) <= allowance:
+            status = "ok"
+        elif delta < 0:
+            status = "faster"
+        elif row["operation"] in gated:
+            status = "REGRESSION"
+        else:
+            status = "slower"
+        rows.append(key + (base["median_ns"], row["median_ns"], change, status))
+    for key, base in previous.items():
+        rows.append(key + (base["median_ns"], None, None, "MISSING"))
+    return rows
+
+def format_table(rows):
+    lines = [f"{'scheme':<9}{'bits':>6}  {'operation':<16}{'baseline ms':>13}{'current ms':>13}{'change':>9}  status"]
+    for scheme, bits, operation, base, current, change, status in rows:
+        base_text = f"{base / 1e6:13.3f}" if base is not None else f"{'-':>13}"
+        change_text = f"{change * 100:+8.1f}%" if change is not None else f"{'-':>9}"
+        current_text = f"{current / 1e6:13.3f}" if current is not None else f"{'-':>13}"
+        lines.append(f"{scheme:<9}{bits:>6}  {operation:<16}{base_text}{current_text}{change_text}  {status}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save benchmark baselines and gate new runs against them")
+    commands = parser.add_subparsers(dest="command", required=True)
+    suite_parser = build_parser()
+
+    save_parser = commands.add_parser("save", parents=[suite_parser], add_help=False,
+                                      help="Run the suite and store it as a named baseline")
+    save_parser.add_argument("name")
+
+    check_parser = commands.add_parser("check", parents=[suite_parser], add_help=False,
+                                       help="Run the suite and compare it with a baseline")
+    check_parser.add_argument("name")
+    check_parser.add_argument("--tolerance", type=float, default=0.25,
+                              help="Allowed slowdown as a fraction of the baseline median")
+    check_parser.add_argument("--noise-sigmas", type=float, default=3.0)
+    check_parser.add_argument("--max-noise", type=float, default=0.5,
+                              help="Cap on the noise allowance as a fraction of the baseline median")
+    check_parser.add_argument("--gate", nargs="+", default=list(GATED_OPERATIONS),
+                              help="Operations whose regression fails the check")
+
+    commands.add_parser("list", help="List stored baselines")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in list_baselines():
+            print(name)
+        return EXIT_OK
+
+    if args.command == "save":
+        results = run_from_args(args)
+        print(f"Saved baseline to {save_baseline(args.name, results, settings_from_args(args))}")
+        return EXIT_OK
+
+    try:
+        baseline = load_baseline(args.name)
+    except FileNotFoundError:
+        print(f"No baseline named '{args.name}'; create one with: save {args.name}", file=sys.stderr)
+        return EXIT_NO_BASELINE
+
+    # Re-run with the baseline's settings so the comparison is like for like
+    for option, value in baseline.get("settings", {}).items():
+        if getattr(args, option) == suite_parser.get_default(option):
+            setattr(args, option, value)
+    current_backend = bigint_backend.get_backend().name
+    if baseline["environment"].get("bigint_backend") != current_backend:
+        print(f"Warning: baseline used the {baseline['environment'].get('bigint_backend')} backend, "
+              f"this run uses {current_backend}", file=sys.stderr)
+
+    # Only baseline rows this run was asked to measure can go missing
+    selected = [row for row in baseline["results"]
+                if row["scheme"] in args.schemes and row["bits"] in args.bits
+                and (args.operations is None or row["operation"] in args.operations)]
+    rows = compare(selected, run_from_args(args), args.tolerance, args.noise_sigmas, args.gate, args.max_noise)
+    print(format_table(rows))
+    failures = [row for row in rows if row[-1] in ("REGRESSION", "MISSING")]
+    if failures:
+        print(f"\n{len(failures)} regression(s) or missing operation(s) against baseline '{args.name}'")
+        return EXIT_REGRESSION
+    print(f"\nNo regressions against baseline '{args.name}'")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
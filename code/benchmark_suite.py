@@ -0,0 +1,216 @@
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import bigint_backend
+from bigint_backend import powmod, invert, mulmod
+from primes import generate_prime
+from paillier_core import generate_keypair, Encryptor
+from threshold_comparator import ThresholdComparator
+from csv_stream import CSVStream
+
+# One benchmark suite for the primitives that the compare_performance copies
+# timed separately. Keys are generated once per size outside the timed
+# loops, every operation gets warmup calls, and results carry enough
+# statistics (median, p95, stddev) to tell a real change from noise.
+
+DEFAULT_BITS = (512, 1024, 2048, 4096)
+# Readings per classify_batch call, the per-chunk loop of blood_oxygen_level_plot.py
+BATCH_SIZE = 16
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input.csv')
+FIELDS = ["scheme", "bits", "operation", "iterations", "median_ns", "p95_ns", "mean_ns", "stddev_ns",
+          "min_ns", "max_ns", "ops_per_second"]
+
+
+def generate_keypair_rsa(bits=512, e=65537):
+    while True:
+        p = generate_prime(bits // 2)
+        q = generate_prime(bits // 2)
+        phi = (p - 1) * (q - 1)
+        if p != q and math.gcd(e, phi) == 1:
+            break
+    n = p * q
+    return (n, e), (invert(e, phi), n)
+
+# Time `iterations` calls of fn() after `warmup` untimed calls; returns nanoseconds per call
+def measure(fn, iterations, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    # Nearest-rank percentile; exact for the small sample counts used here
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(samples):
+    median = statistics.median(samples)
+    return {
+        "iterations": len(samples),
+        "median_ns": median,
+        "p95_ns": percentile(samples, 0.95),
+        "mean_ns": statistics.fmean(samples),
+        "stddev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        # Median absolute deviation: a spread that a few outliers cannot inflate
+        "mad_ns": statistics.median(abs(sample - median) for sample in samples),
+        "min_ns": min(samples),
+        "max_ns": max(samples),
+        "ops_per_second": 1e9 / median if median else float('inf'),
+    }
+
+
+def paillier_operations(bits):
+    public_key, private_key = generate_keypair(bits)
+    n, _ = public_key
+    n_sq = n * n
+    encryptor = Encryptor(public_key)
+    comparator = ThresholdComparator(public_key, private_key, threshold=85)
+    c1 = encryptor.encrypt(random.randrange(n))
+    c2 = encryptor.encrypt(random.randrange(n))
+    reading = encryptor.encrypt(90)
+    scalar = random.randrange(1 << 32)
+    batch = list(CSVStream(SAMPLE_CSV, max_entries=BATCH_SIZE))
+    return {
+        "encrypt": lambda: encryptor.encrypt(42),
+        "decrypt": lambda: private_key.decrypt(c1),
+        "add": lambda: mulmod(c1, c2, n_sq),
+        "scalar_multiply": lambda: powmod(c1, scalar, n_sq),
+        "mask": lambda: comparator.masked_difference(reading),
+        "compare": lambda: comparator.classify_ciphertext(reading),
+        "classify_batch": lambda: comparator.classify_many(batch, workers=1),
+    }
+
+def rsa_operations(bits):
+    (n, e), (d, _) = generate_keypair_rsa(bits)
+    m1 = random.randrange(2, n)
+    c1 = powmod(m1, e, n)
+    c2 = powmod(random.randrange(2, n), e, n)
+    scalar = random.randrange(1 << 32)
+    # RSA is multiplicatively homomorphic: the ciphertext product encrypts the plaintext product
+    return {
+        "encrypt": lambda: powmod(m1, e, n),
+        "decrypt": lambda: powmod(c1, d, n),
+        "multiply": lambda: mulmod(c1, c2, n),
+        "scalar_multiply": lambda: powmod(c1, scalar, n),
+    }
+
+SCHEMES = {
+    "paillier": (generate_keypair, paillier_operations),
+    "rsa": (generate_keypair_rsa, rsa_operations),
+}
+
+
+def run_suite(bit_sizes=DEFAULT_BITS, schemes=tuple(SCHEMES), iterations=50, warmup=5,
+              keygen_iterations=3, operations=None, verbose=True):
+    """Benchmark every scheme, key size and operation; returns a list of result rows."""
+    results = []
+    for scheme in schemes:
+        keygen, build_operations = SCHEMES[scheme]
+        for bits in bit_sizes:
+            timed = {}
+            if operations is None or "keygen" in operations:
+                # Key generation is slow and its time is dominated by prime search, so no warmup
+                timed["keygen"] = measure(lambda: keygen(bits), keygen_iterations, warmup=0)
+            for operation, fn in build_operations(bits).items():
+                if operations is None or operation in operations:
+                    timed[operation] = measure(fn, iterations, warmup)
+
+            for operation, samples in timed.items():
+                row = {"scheme": scheme, "bits": bits, "operation": operation}
+                row.update(summarize(samples))
+                results.append(row)
+                if verbose:
+                    print(f"{scheme:>8} {bits:>5} {operation:<16} median {row['median_ns'] / 1e6:10.3f} ms  "
+                          f"p95 {row['p95_ns'] / 1e6:10.3f} ms  stddev {row['stddev_ns'] / 1e6:8.3f} ms")
+    return results
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "platform": platform.platform(),
+        "bigint_backend": bigint_backend.get_backend().name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def write_json(results, path, settings=None):
+    with open(path, 'w') as f:
+        json.dump({"environment": environment(), "settings": settings or {}, "results": results}, f, indent=2)
+
+def write_csv(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)["results"]
+
+def settings_from_args(args):
+    return {"bits": args.bits, "schemes": args.schemes, "operations": args.operations,
+            "iterations": args.iterations, "warmup": args.warmup, "keygen_iterations": args.keygen_iterations}
+
+# Headless plot of median latency per operation, one panel per scheme
+def plot_results(results, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    schemes = sorted({row["scheme"] for row in results})
+    fig, axes = plt.subplots(1, len(schemes), figsize=(7 * len(schemes), 5), squeeze=False)
+    for ax, scheme in zip(axes[0], schemes):
+        rows = [row for row in results if row["scheme"] == scheme]
+        for operation in sorted({row["operation"] for row in rows}):
+            points = sorted((row["bits"], row["median_ns"] / 1e6) for row in rows if row["operation"] == operation)
+            ax.plot([b for b, _ in points], [t for _, t in points], marker='o', label=operation)
+        ax.set_yscale('log')
+        ax.set_xlabel('Key Size (bits)')
+        ax.set_ylabel('Median Time (ms)')
+        ax.set_title(scheme)
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Paillier and RSA micro-benchmarks")
+    parser.add_argument("--bits", type=int, nargs="+", default=list(DEFAULT_BITS))
+    parser.add_argument("--schemes", nargs="+", choices=list(SCHEMES), default=list(SCHEMES))
+    parser.add_argument("--operations", nargs="+", default=None, help="Only run these operations")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--keygen-iterations", type=int, default=3)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    parser.add_argument("--csv", help="Write results as CSV to this path")
+    parser.add_argument("--plot", help="Save a PNG plot of the results to this path")
+    return parser
+
+def run_from_args(args):
+    return run_suite(args.bits, args.schemes, args.iterations, args.warmup, args.keygen_iterations,
+                     args.operations)
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    results = run_from_args(args)
+    if args.json:
+        write_json(results, args.json, settings_from_args(args))
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.plot:
+        plot_results(results, args.plot)
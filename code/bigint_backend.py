@@ -0,0 +1,132 @@
+import os
+import random
+import time
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+class PythonBackend:
+    """Big-integer arithmetic with Python built-ins."""
+
+    name = "python"
+
+    def powmod(self, base, exponent, modulus):
+        return pow(base, exponent, modulus)
+
+    def invert(self, a, modulus):
+        return pow(a, -1, modulus)
+
+    def mul(self, a, b):
+        return a * b
+
+    def mulmod(self, a, b, modulus):
+        return a * b % modulus
+
+    def is_prime(self, n, rounds=None):
+        # Imported here because primes itself routes through this module
+        from primes import is_probable_prime
+        return is_probable_prime(n, rounds)
+
+
+class GmpyBackend:
+    """Big-integer arithmetic with gmpy2 (GMP); results are returned as ints."""
+
+    name = "gmpy2"
+
+    def powmod(self, base, exponent, modulus):
+        return int(gmpy2.powmod(base, exponent, modulus))
+
+    def invert(self, a, modulus):
+        try:
+            return int(gmpy2.invert(a, modulus))
+        except ZeroDivisionError:
+            # Same exception and message as PythonBackend, whichever library is installed
+            raise ValueError("base is not invertible for the given modulus") from None
+
+    def mul(self, a, b):
+        return int(gmpy2.mul(a, b))
+
+    def mulmod(self, a, b, modulus):
+        return int(gmpy2.f_mod(gmpy2.mul(a, b), modulus))
+
+    def is_prime(self, n, rounds=None):
+        return bool(gmpy2.is_prime(n, rounds or 25))
+
+
+BACKENDS = {"python": PythonBackend}
+if gmpy2 is not None:
+    BACKENDS["gmpy2"] = GmpyBackend
+
+def available_backends():
+    return list(BACKENDS)
+
+# Select a backend by name; "auto" prefers gmpy2 when it is installed
+def set_backend(name="auto"):
+    global backend
+    if name == "auto":
+        name = "gmpy2" if "gmpy2" in BACKENDS else "python"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable big-integer backend: {name}")
+    backend = BACKENDS[name]()
+    return backend
+
+def get_backend():
+    return backend
+
+# The BIGINT_BACKEND environment variable picks the backend at start-up
+backend = None
+set_backend(os.environ.get("BIGINT_BACKEND", "auto"))
+
+def powmod(base, exponent, modulus):
+    return backend.powmod(base, exponent, modulus)
+
+def invert(a, modulus):
+    return backend.invert(a, modulus)
+
+def mul(a, b):
+    return backend.mul(a, b)
+
+def mulmod(a, b, modulus):
+    return backend.mulmod(a, b, modulus)
+
+def is_prime(n, rounds=None):
+    return backend.is_prime(n, rounds)
+
+# Time each operation per backend and key size, and report the speedup over pure Python
+def self_benchmark(key_sizes=(1024, 2048, 3072, 4096), repeats=20):
+    results = []
+    for key_bits in key_sizes:
+        # Paillier-shaped operands: exponents of n's size modulo n^2
+        modulus = random.getrandbits(2 * key_bits) | 1
+        exponent = random.getrandbits(key_bits)
+        a = random.getrandbits(2 * key_bits) % modulus
+        b = random.getrandbits(2 * key_bits) % modulus
+        prime_candidate = random.getrandbits(key_bits // 2) | 1
+
+        operations = {
+            "powmod": lambda impl: impl.powmod(a, exponent, modulus),
+            "invert": lambda impl: impl.invert(a | 1, 1 << (2 * key_bits)),
+            "mulmod": lambda impl: impl.mulmod(a, b, modulus),
+            "is_prime": lambda impl: impl.is_prime(prime_candidate, 1),
+        }
+        for operation, call in operations.items():
+            timings = {}
+            for name, backend_class in BACKENDS.items():
+                impl = backend_class()
+                start_time = time.perf_counter()
+                for _ in range(repeats):
+                    call(impl)
+                timings[name] = (time.perf_counter() - start_time) / repeats
+            for name, seconds in timings.items():
+                speedup = timings["python"] / seconds if seconds else float('inf')
+                results.append({"key_bits": key_bits, "operation": operation, "backend": name,
+                                "seconds": seconds, "speedup": speedup})
+                print(f"{key_bits:>5} bits  {operation:<9} {name:<7} {seconds * 1e6:12.1f} us  {speedup:6.2f}x")
+    return results
+
+if __name__ == "__main__":
+    print(f"Available backends: {', '.join(available_backends())} (selected: {backend.name})")
+    self_benchmark()
@@ -0,0 +1,169 @@
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+
+# File layout (all integers big-endian):
+#   header (64 bytes): magic, version, flags, modulus bits, record size, row count, key fingerprint
+#   ciphertext column: count fixed-width records of record_size bytes
+#   row-id column (if FLAG_ROW_IDS): count unsigned 64-bit row ids
+MAGIC = b"PCTX"
+VERSION = 1
+FLAG_ROW_IDS = 1
+HEADER = struct.Struct(">4sHHIIQ32s")
+HEADER_SIZE = 64
+ROW_ID = struct.Struct(">Q")
+
+# SHA-256 of the public modulus, used to check a file matches a key
+def key_fingerprint(n):
+    return hashlib.sha256(n.to_bytes((n.bit_length() + 7) // 8, 'big')).digest()
+
+def record_size_for(n):
+    return ((n * n).bit_length() + 7) // 8
+
+
+class CiphertextWriter:
+    """Write Paillier ciphertexts as fixed-width big-endian records."""
+
+    def __init__(self, path, public_key, with_row_ids=False):
+        n, _ = public_key
+        self.n = n
+        self.record_size = record_size_for(n)
+        self.with_row_ids = with_row_ids
+        self.count = 0
+        # Row ids are stored after the ciphertext column, so they are buffered until close
+        self._row_ids = array('Q')
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        flags = FLAG_ROW_IDS if self.with_row_ids else 0
+        header = HEADER.pack(MAGIC, VERSION, flags, self.n.bit_length(), self.record_size,
+                             self.count, key_fingerprint(self.n))
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    def write(self, ciphertext, row_id=None):
+        # Check everything before writing, so a bad call leaves the columns aligned
+        record = ciphertext.to_bytes(self.record_size, 'big')
+        if self.with_row_ids:
+            if row_id is None:
+                raise ValueError("This file stores row ids; row_id is required")
+            self._row_ids.append(row_id)
+        self._file.write(record)
+        self.count += 1
+
+    def write_many(self, ciphertexts, row_ids=None):
+        if row_ids is None:
+            for ciphertext in ciphertexts:
+                self.write(ciphertext)
+        else:
+            for ciphertext, row_id in zip(ciphertexts, row_ids):
+                self.write(ciphertext, row_id)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.with_row_ids:
+            if sys.byteorder == 'little':
+                self._row_ids.byteswap()
+            self._file.write(self._row_ids.tobytes())
+        # Rewrite the header now that the row count is known
+        self._file.seek(0)
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CiphertextReader:
+    """Memory-mapped reader with zero-copy random access to ciphertext records."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        size = len(self._mmap)
+        if size < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a ciphertext file")
+        magic, version, flags, modulus_bits, record_size, count, fingerprint = \
+            HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a ciphertext file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported ciphertext file version {version}")
+        expected_size = HEADER_SIZE + count * (record_size + (ROW_ID.size if flags & FLAG_ROW_IDS else 0))
+        if size != expected_size:
+            self.close()
+            raise ValueError(f"{path} is {size} bytes but its header describes {expected_size}; "
+                             f"the file is truncated or was not closed")
+        self.modulus_bits = modulus_bits
+        self.record_size = record_size
+        self.count = count
+        self.fingerprint = fingerprint
+        self.has_row_ids = bool(flags & FLAG_ROW_IDS)
+        self._row_ids_start = HEADER_SIZE + count * record_size
+
+    def check_key(self, public_key):
+        n, _ = public_key
+        if key_fingerprint(n) != self.fingerprint:
+            raise ValueError("Ciphertext file was written under a different public key")
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """Zero-copy memoryview of the raw big-endian record at index.
+
+        The view is only valid while the reader is open.
+        """
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = HEADER_SIZE + index * self.record_size
+        return self._view[start:start + self.record_size]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        return int.from_bytes(self.record(index), 'big')
+
+    def row_id(self, index):
+        if not self.has_row_ids:
+            raise ValueError("This file has no row-id column")
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return ROW_ID.unpack_from(self._view, self._row_ids_start + index * ROW_ID.size)[0]
+
+    # Sequential scans over the mapped records
+    def scan_records(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        size = self.record_size
+        for offset in range(HEADER_SIZE + start * size, HEADER_SIZE + stop * size, size):
+            yield self._view[offset:offset + size]
+
+    def __iter__(self):
+        for record in self.scan_records():
+            yield int.from_bytes(record, 'big')
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a record view; the map is freed with the last view
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
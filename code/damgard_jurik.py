@@ -0,0 +1,110 @@
+import math
+import random
+import time
+from bigint_backend import powmod, invert, mulmod
+from primes import generate_prime
+
+# Damgård–Jurik generalisation of Paillier: plaintexts live modulo n^s and
+# ciphertexts modulo n^(s+1), so the expansion is (s+1)/s instead of 2.
+# s = 1 is plain Paillier with g = n + 1.
+
+# Generate keypair; public key is (n, s), private key is (lambda_n, mu)
+def generate_keypair(bits=512, s=1):
+    if s < 1:
+        raise ValueError("s must be at least 1")
+    p = generate_prime(bits // 2)
+    q = generate_prime(bits // 2)
+    while p == q:
+        q = generate_prime(bits // 2)
+    n = p * q
+    lambda_n = (p - 1) * (q - 1)
+    mu = invert(lambda_n, n ** s)
+
+    public_key = (n, s)
+    private_key = (lambda_n, mu)
+
+    return public_key, private_key
+
+# (1 + n)^m mod n^(s+1) by the binomial expansion, which stops after s + 1 terms
+def _one_plus_n_pow(m, n, s):
+    ns1 = n ** (s + 1)
+    result = 1
+    term = 1
+    for k in range(1, s + 1):
+        # term = C(m, k) * n^k, built up incrementally
+        term = term * (m - k + 1) * n // k
+        result += term
+    return result % ns1
+
+# Recover i from (1 + n)^i mod n^(s+1) (Damgård–Jurik, Theorem 1)
+def _extract(a, n, s):
+    i = 0
+    for j in range(1, s + 1):
+        nj = n ** j
+        t1 = ((a % (nj * n)) - 1) // n
+        t2 = i
+        for k in range(2, j + 1):
+            i -= 1
+            t2 = (t2 * i) % nj
+            t1 = (t1 - t2 * n ** (k - 1) * invert(math.factorial(k), nj)) % nj
+        i = t1
+    return i
+
+# Encrypt the message using the public key
+def encrypt(message, public_key):
+    n, s = public_key
+    ns = n ** s
+    ns1 = ns * n
+    r = random.randint(1, n - 1)
+    return mulmod(_one_plus_n_pow(message % ns, n, s), powmod(r, ns, ns1), ns1)
+
+# Decrypt the ciphertext using the private key
+def decrypt(ciphertext, private_key, public_key):
+    n, s = public_key
+    lambda_n, mu = private_key
+    ns = n ** s
+    u = powmod(ciphertext, lambda_n, ns * n)
+    return (_extract(u, n, s) * mu) % ns
+
+# Homomorphic addition: multiply the ciphertexts
+def homomorphic_addition(c1, c2, public_key):
+    n, s = public_key
+    return mulmod(c1, c2, n ** (s + 1))
+
+# Throughput versus ciphertext expansion for s = 1..4
+def benchmark(bits=1024, s_values=(1, 2, 3, 4), iterations=10):
+    results = []
+    for s in s_values:
+        public_key, private_key = generate_keypair(bits, s)
+        n, _ = public_key
+        message = random.randrange(n ** s)
+
+        start_time = time.perf_counter()
+        ciphertexts = [encrypt(message, public_key) for _ in range(iterations)]
+        encryption_time = (time.perf_counter() - start_time) / iterations
+
+        start_time = time.perf_counter()
+        for ciphertext in ciphertexts:
+            assert decrypt(ciphertext, private_key, public_key) == message
+        decryption_time = (time.perf_counter() - start_time) / iterations
+
+        plaintext_bits = s * n.bit_length()
+        # Plaintext bits processed per second is what matters for bulk (packed) data
+        row = {
+            "s": s,
+            "plaintext_bits": plaintext_bits,
+            "ciphertext_bits": (s + 1) * n.bit_length(),
+            "expansion": (s + 1) / s,
+            "encrypt_seconds": encryption_time,
+            "decrypt_seconds": decryption_time,
+            "encrypt_kbit_per_second": plaintext_bits / encryption_time / 1000,
+            "decrypt_kbit_per_second": plaintext_bits / decryption_time / 1000,
+        }
+        results.append(row)
+        print(f"s={s}: expansion {row['expansion']:.2f}x, "
+              f"encrypt {encryption_time * 1000:.1f} ms ({row['encrypt_kbit_per_second']:.1f} kbit/s), "
+              f"decrypt {decryption_time * 1000:.1f} ms ({row['decrypt_kbit_per_second']:.1f} kbit/s)")
+    return results
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,170 @@
+import atexit
+import json
+import os
+import sys
+import time
+
+# Named stage timers and counters for the threshold pipeline.
+#
+#     with instrumentation.stage("decrypt"):
+#         ...
+#
+# Disabled (the default), stage() returns a shared no-op context manager,
+# so an instrumented call costs one function call and a flag check.
+# Set PIPELINE_PROFILE=1 to enable it and print the report at exit, or
+# PIPELINE_PROFILE=<path>.json to also write the report there. Stages run
+# inside worker processes are not collected, so profile with workers=1.
+
+_profile_setting = os.environ.get("PIPELINE_PROFILE", "")
+_enabled = _profile_setting not in ("", "0")
+_stages = {}
+_counters = {}
+
+
+class StageStats:
+    """Call count, total time and a log2 latency histogram for one stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        # Bucket k holds calls that took [2^(k-1), 2^k) nanoseconds
+        self.histogram = {}
+
+    def add(self, elapsed_ns):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = elapsed_ns.bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Upper bound of the histogram bucket holding this fraction of calls."""
+        target = fraction * self.calls
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= target:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.calls if self.calls else 0,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "p50_ns": self.percentile(0.50),
+            "p95_ns": self.percentile(0.95),
+            "histogram": {f"<{1 << bucket}ns": count for bucket, count in sorted(self.histogram.items())},
+        }
+
+
+class _StageTimer:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add(time.perf_counter_ns() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+def enabled():
+    return _enabled
+
+# The JSON report path from PIPELINE_PROFILE, or None when only the text report is wanted
+def profile_path():
+    return _profile_setting if _profile_setting.endswith(".json") else None
+
+def reset():
+    _stages.clear()
+    _counters.clear()
+
+def _stats(name):
+    stats = _stages.get(name)
+    if stats is None:
+        stats = _stages[name] = StageStats(name)
+    return stats
+
+def stage(name):
+    if not _enabled:
+        return _NULL_TIMER
+    return _StageTimer(_stats(name))
+
+# Record a duration measured by the caller, for stages that are not a single block
+def record(name, elapsed_ns):
+    if _enabled:
+        _stats(name).add(elapsed_ns)
+
+def count(name, amount=1):
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def snapshot():
+    return {
+        "stages": {name: stats.as_dict() for name, stats in _stages.items()},
+        "counters": dict(_counters),
+    }
+
+def report():
+    """Per-stage totals, call counts and latency histograms as a text table."""
+    if not _stages and not _counters:
+        return "No stages recorded"
+    grand_total = sum(stats.total_ns for stats in _stages.values()) or 1
+    lines = [f"{'stage':<14}{'calls':>9}{'total ms':>12}{'share':>8}{'mean us':>11}{'p50 us':>10}{'p95 us':>10}{'max us':>10}"]
+    for stats in sorted(_stages.values(), key=lambda s: s.total_ns, reverse=True):
+        lines.append(f"{stats.name:<14}{stats.calls:>9}{stats.total_ns / 1e6:12.2f}"
+                     f"{stats.total_ns / grand_total:8.1%}{stats.total_ns / stats.calls / 1e3:11.1f}"
+                     f"{stats.percentile(0.5) / 1e3:10.1f}{stats.percentile(0.95) / 1e3:10.1f}{stats.max_ns / 1e3:10.1f}")
+    for stats in sorted(_stages.values(), key=lambda s: s.total_ns, reverse=True):
+        lines.append(f"\n{stats.name} latency histogram")
+        widest = max(stats.histogram.values())
+        for bucket, calls in sorted(stats.histogram.items()):
+            bar = "#" * max(1, round(40 * calls / widest))
+            lines.append(f"  < {(1 << bucket) / 1e3:>10.1f} us {calls:>8} {bar}")
+    if _counters:
+        lines.append("\ncounters")
+        for name, value in sorted(_counters.items()):
+            lines.append(f"  {name:<20}{value:>10}")
+    return "\n".join(lines)
+
+def dump(path=None, stream=None):
+    """Print the report, and write it as JSON when a path is given."""
+    print(report(), file=stream or sys.stderr)
+    if path:
+        with open(path, 'w') as f:
+            json.dump(snapshot(), f, indent=2)
+
+def _dump_at_exit():
+    if _stages or _counters:
+        dump(profile_path())
+
+if _enabled:
+    atexit.register(_dump_at_exit)
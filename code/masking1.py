@@ -1,39 +1,6 @@
 import random
-from sympy import isprime, mod_inverse
-
-# Generate a prime number with the specified number of bits
-def generate_prime(bits):
-    while True:
-        prime_candidate = random.getrandbits(bits)
-        if isprime(prime_candidate):
-            return prime_candidate
-
-# Generate keypair
-def generate_keypair(bits=512):
-    p = generate_prime(bits // 2)
-    q = generate_prime(bits // 2)
-    n = p * q
-    lambda_n = (p - 1) * (q - 1)
-    g = n + 1
-    mu = mod_inverse(lambda_n, n)
-    
-    public_key = (n, g)
-    private_key = (lambda_n, mu)
-    
-    return public_key, private_key
-
-# Encrypt the message using the public key
-def encrypt(message, public_key):
-    n, g = public_key
-    n_sq = n * n
-
-    # Generate a random number r
-    r = random.randint(1, n-1)
-
-    # Encryption
-    c = (pow(g, message, n_sq) * pow(r, n, n_sq)) % n_sq
-    
-    return c
+from sympy import mod_inverse
+from paillier_core import generate_keypair, encrypt, decrypt
 
 # Mask the ciphertext by raising it to a power
 def mask_ciphertext(ciphertext, public_key):
@@ -49,23 +16,6 @@ def mask_ciphertext(ciphertext, public_key):
     
     return masked_ciphertext, power
 
-# Decrypt the masked ciphertext
-def decrypt(masked_ciphertext, private_key, public_key):
-    n, _ = public_key
-    lambda_n, mu = private_key
-    n_sq = n * n
-
-    def L(x):
-        return (x - 1) // n
-
-    # Decrypt the masked ciphertext
-    u = pow(masked_ciphertext, lambda_n, n_sq)
-    l = L(u)
-    
-    # Decrypt the message
-    message = (l * mu) % n
-    return message
-
 # Demask the decrypted message
 def demask_message(decrypted_message, power, public_key):
     n, _ = public_key
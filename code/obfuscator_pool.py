@@ -0,0 +1,143 @@
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from bigint_backend import powmod
+
+# r must be unpredictable: these values blind real ciphertexts, e.g. login responses
+def _random_r(n):
+    return secrets.randbelow(n - 1) + 1
+
+# Compute a batch of r^n mod n^2 obfuscators (module level so it can run in a worker process)
+def generate_obfuscators(n, count):
+    n_sq = n * n
+    return [powmod(_random_r(n), n, n_sq) for _ in range(count)]
+
+
+class ObfuscatorPool:
+    """Pool of precomputed r^n mod n^2 values for one public key.
+
+    The message-independent part of Paillier encryption is done ahead of
+    time by a background thread, so online encryption costs one modular
+    multiplication. With ``processes`` > 0 the thread hands the work, in
+    batches of ``batch``, to a process pool instead of computing under the
+    GIL itself.
+    """
+
+    def __init__(self, n, size=1024, low_water=256, batch=8, processes=0, start=True):
+        if not 0 <= low_water < size:
+            raise ValueError("low_water must be between 0 and size - 1")
+        self.n = n
+        self.n_sq = n * n
+        self.size = size
+        self.low_water = low_water
+        self.batch = batch
+        self.processes = processes
+
+        self.hits = 0
+        self.stalls = 0
+        self.generated = 0
+
+        self._pool = deque()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        if start:
+            self.start()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._fill, daemon=True)
+            self._thread.start()
+            self._refill.set()
+
+    def close(self):
+        self._stopped.set()
+        self._refill.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fill(self):
+        executor = ProcessPoolExecutor(self.processes) if self.processes else None
+        try:
+            while not self._stopped.is_set():
+                self._refill.wait()
+                while not self._stopped.is_set():
+                    missing = self.size - len(self._pool)
+                    if missing <= 0:
+                        break
+                    if executor is None:
+                        # One at a time, so consumers see each value as soon as it exists
+                        values = generate_obfuscators(self.n, 1)
+                    else:
+                        counts = [self.batch] * max(1, min(self.processes, missing // self.batch))
+                        futures = [executor.submit(generate_obfuscators, self.n, c) for c in counts]
+                        values = [v for f in futures for v in f.result()]
+                    with self._lock:
+                        self._pool.extend(values[:self.size - len(self._pool)])
+                        self.generated += len(values)
+                self._refill.clear()
+                # Re-check in case a consumer drained the pool while we were clearing
+                if len(self._pool) < self.low_water:
+                    self._refill.set()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def get(self):
+        """Return one r^n mod n^2, computing it inline if the pool is empty."""
+        with self._lock:
+            if self._pool:
+                value = self._pool.popleft()
+                self.hits += 1
+            else:
+                value = None
+                self.stalls += 1
+            if len(self._pool) < self.low_water:
+                self._refill.set()
+        if value is None:
+            value = powmod(_random_r(self.n), self.n, self.n_sq)
+        return value
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "low_water": self.low_water,
+            "available": len(self._pool),
+            "hits": self.hits,
+            "stalls": self.stalls,
+            "generated": self.generated,
+        }
+
+
+# One pool per public modulus
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(n, **kwargs):
+    with _pools_lock:
+        pool = _pools.get(n)
+        if pool is None:
+            pool = _pools[n] = ObfuscatorPool(n, **kwargs)
+        return pool
+
+# Encrypt with a phe PaillierPublicKey, taking the obfuscator from the pool
+def encrypt_phe(public_key, value, pool):
+    from phe import paillier
+
+    encoding = paillier.EncodedNumber.encode(public_key, value)
+    # r_value=1 skips phe's own r^n exponentiation
+    ciphertext = public_key.raw_encrypt(encoding.encoding, r_value=1)
+    ciphertext = (ciphertext * pool.get()) % public_key.nsquare
+    encrypted_number = paillier.EncryptedNumber(public_key, ciphertext, encoding.exponent)
+    # Already obfuscated; stop phe from doing it again on ciphertext()
+    encrypted_number._EncryptedNumber__is_obfuscated = True
+    return encrypted_number
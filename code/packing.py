@@ -0,0 +1,84 @@
+from bigint_backend import mulmod
+from paillier_batch import encrypt_many, decrypt_many
+from preprocess import pack_array, unpack_array
+
+
+class SlotPacker:
+    """Pack many small readings into fixed-width slots of one Paillier plaintext.
+
+    Each slot is ``value_bits`` wide plus ``headroom_bits`` of carry space,
+    so up to 2**headroom_bits packed ciphertexts can be added slot-wise
+    before a slot overflows into its neighbour. Values must be
+    non-negative and below 2**value_bits.
+    """
+
+    def __init__(self, public_key, value_bits=8, headroom_bits=8):
+        n, _ = public_key
+        self.n_sq = n * n
+        self.value_bits = value_bits
+        self.headroom_bits = headroom_bits
+        self.slot_bits = value_bits + headroom_bits
+        self.slot_mask = (1 << self.slot_bits) - 1
+        # Keep the packed plaintext strictly below n
+        self.slots = (n.bit_length() - 1) // self.slot_bits
+        if self.slots < 1:
+            raise ValueError("Slot width does not fit in the public modulus")
+        self.max_additions = 1 << headroom_bits
+
+    def pack(self, values):
+        if len(values) > self.slots:
+            raise ValueError(f"At most {self.slots} values fit in one plaintext")
+        plaintext = 0
+        for i, value in enumerate(values):
+            if not 0 <= value < (1 << self.value_bits):
+                raise ValueError(f"Value {value} does not fit in {self.value_bits} bits")
+            plaintext |= value << (i * self.slot_bits)
+        return plaintext
+
+    def unpack(self, plaintext, count=None):
+        count = self.slots if count is None else count
+        return [(plaintext >> (i * self.slot_bits)) & self.slot_mask for i in range(count)]
+
+    def pack_many(self, values):
+        values = list(values)
+        return [self.pack(values[i:i + self.slots]) for i in range(0, len(values), self.slots)]
+
+    def unpack_many(self, plaintexts, count):
+        values = []
+        for plaintext in plaintexts:
+            values.extend(self.unpack(plaintext, min(self.slots, count - len(values))))
+        return values
+
+    # Slot-wise homomorphic addition of two packed ciphertexts
+    def add(self, c1, c2):
+        return mulmod(c1, c2, self.n_sq)
+
+    def encrypt(self, values, public_key, workers=None):
+        # Plaintexts are packed in bulk with NumPy before reaching the big-integer layer
+        return encrypt_many(pack_array(values, self), public_key, workers=workers)
+
+    def decrypt(self, ciphertexts, private_key, count, public_key=None, workers=None):
+        plaintexts = decrypt_many(ciphertexts, private_key, public_key, workers=workers)
+        return unpack_array(plaintexts, self, count).tolist()
+
+
+if __name__ == "__main__":
+    from paillier_core import generate_keypair
+    from blood_oxygen_level import read_inputs_from_csv
+
+    messages = read_inputs_from_csv('input.csv', max_entries=20000)
+    public_key, private_key = generate_keypair(bits=2048)
+    packer = SlotPacker(public_key)
+
+    ciphertexts = packer.encrypt(messages, public_key)
+    assert packer.decrypt(ciphertexts, private_key, len(messages)) == messages
+
+    # Slot-wise sum of the first two packed ciphertexts
+    total = packer.decrypt([packer.add(ciphertexts[0], ciphertexts[1])], private_key, packer.slots)
+    expected = [a + b for a, b in zip(messages[:packer.slots], messages[packer.slots:2 * packer.slots])]
+    assert total[:len(expected)] == expected
+
+    ciphertext_bytes = (public_key[0] ** 2).bit_length() // 8
+    print(f"{len(messages)} readings, {packer.slots} slots of {packer.slot_bits} bits per plaintext")
+    print(f"Ciphertexts: {len(ciphertexts)} packed vs {len(messages)} unpacked")
+    print(f"Storage: {len(ciphertexts) * ciphertext_bytes} bytes packed vs {len(messages) * ciphertext_bytes} bytes unpacked")
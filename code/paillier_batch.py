@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from paillier_core import Encryptor, decrypt, check_decryption_key
+
+# Per-worker key state, set once by the pool initializer
+_encryptor = None
+_private_key = None
+_public_key = None
+
+def _init_encrypt_worker(public_key):
+    global _encryptor
+    _encryptor = Encryptor(public_key)
+
+def _init_decrypt_worker(private_key, public_key):
+    global _private_key, _public_key
+    _private_key = private_key
+    _public_key = public_key
+
+def _encrypt_chunk(values):
+    return [_encryptor.encrypt(value) for value in values]
+
+def _decrypt_chunk(ciphertexts):
+    return [decrypt(c, _private_key, _public_key) for c in ciphertexts]
+
+# Pick a chunk size giving each worker a few chunks, so stragglers even out
+def adaptive_chunk_size(count, workers, chunks_per_worker=4, max_chunk=2048):
+    size = -(-count // (workers * chunks_per_worker))
+    return max(1, min(size, max_chunk))
+
+def _run(items, worker_count, initializer, initargs, chunk_function, chunksize, serial):
+    items = list(items)
+    if not items:
+        return []
+    workers = worker_count or os.cpu_count() or 1
+    workers = min(workers, len(items))
+    if workers == 1:
+        return serial(items)
+    chunksize = chunksize or adaptive_chunk_size(len(items), workers)
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+
+    # The key is sent once per worker through the initializer, not with every chunk
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as executor:
+        results = []
+        for chunk_result in executor.map(chunk_function, chunks):
+            results.extend(chunk_result)
+    return results
+
+# Encrypt many values in parallel, preserving input order
+def encrypt_many(values, public_key, workers=None, chunksize=None):
+    def serial(items):
+        encryptor = Encryptor(public_key)
+        return [encryptor.encrypt(value) for value in items]
+
+    return _run(values, workers, _init_encrypt_worker, (public_key,), _encrypt_chunk, chunksize, serial)
+
+# Decrypt many ciphertexts in parallel, preserving input order
+def decrypt_many(ciphertexts, private_key, public_key=None, workers=None, chunksize=None):
+    # Fail here rather than once per worker process
+    check_decryption_key(private_key, public_key)
+
+    def serial(items):
+        return [decrypt(c, private_key, public_key) for c in items]
+
+    return _run(ciphertexts, workers, _init_decrypt_worker, (private_key, public_key), _decrypt_chunk, chunksize, serial)
@@ -0,0 +1,144 @@
+import random
+from bigint_backend import powmod, invert, mulmod
+from primes import generate_prime
+import instrumentation
+
+
+class PrivateKeyCRT:
+    """Paillier private key that keeps p and q for CRT decryption.
+
+    Unpacks as ``(lambda_n, mu)`` so code written against the plain tuple
+    private key keeps working.
+    """
+
+    def __init__(self, public_key, p, q):
+        n, g = public_key
+        if p * q != n:
+            raise ValueError("p * q does not match the public modulus")
+        if p == q:
+            raise ValueError("p and q must be distinct")
+        self.n = n
+        self.g = g
+        self.p = p
+        self.q = q
+        self.psquare = p * p
+        self.qsquare = q * q
+        self.p_inverse = invert(p, q)
+
+        # Classic private key, kept for callers that still unpack it
+        self.lambda_n = (p - 1) * (q - 1)
+        self.mu = invert((powmod(g, self.lambda_n, n * n) - 1) // n, n)
+
+        # hp = L_p(g^(p-1) mod p^2)^-1 mod p, and the same for q
+        self.hp = self.h_function(p, self.psquare)
+        self.hq = self.h_function(q, self.qsquare)
+
+    def h_function(self, x, xsquare):
+        return invert((powmod(self.g, x - 1, xsquare) - 1) // x, x)
+
+    def decrypt(self, ciphertext):
+        # Two half-size exponentiations modulo p^2 and q^2
+        mp = ((powmod(ciphertext, self.p - 1, self.psquare) - 1) // self.p * self.hp) % self.p
+        mq = ((powmod(ciphertext, self.q - 1, self.qsquare) - 1) // self.q * self.hq) % self.q
+
+        # Recombine with the CRT
+        u = ((mq - mp) * self.p_inverse) % self.q
+        return mp + u * self.p
+
+    def __iter__(self):
+        return iter((self.lambda_n, self.mu))
+
+    def __repr__(self):
+        return f"PrivateKeyCRT(n={self.n.bit_length()} bits)"
+
+
+# Generate keypair, keeping p and q in the private key
+def generate_keypair(bits=512):
+    p = generate_prime(bits // 2)
+    q = generate_prime(bits // 2)
+    while p == q:
+        q = generate_prime(bits // 2)
+    n = p * q
+    g = n + 1
+
+    public_key = (n, g)
+    private_key = PrivateKeyCRT(public_key, p, q)
+
+    return public_key, private_key
+
+# Report which encryption path a public key takes
+def encryption_path(public_key):
+    n, g = public_key
+    return "fast" if g == n + 1 else "general"
+
+# Number of encryptions performed on each path, for throughput attribution
+encryption_path_counts = {"fast": 0, "general": 0}
+
+
+class Encryptor:
+    """Per-key encryption engine with the g = n + 1 fast path.
+
+    For g = n + 1, g^m mod n^2 is just 1 + m*n, so the only exponentiation
+    left is the r^n obfuscator. Keys with a random g (see ``find_valid_g``)
+    fall back to the general pow(g, m, n^2).
+    """
+
+    def __init__(self, public_key, pool=None):
+        self.n, self.g = public_key
+        self.n_sq = self.n * self.n
+        self.path = encryption_path(public_key)
+        self.pool = pool
+        self.count = 0
+
+    def raw_encrypt(self, message):
+        # g^m mod n^2, without the random obfuscator
+        if self.path == "fast":
+            return (1 + message * self.n) % self.n_sq
+        return powmod(self.g, message, self.n_sq)
+
+    def obfuscator(self, r=None):
+        # r^n mod n^2, from the precomputed pool when one is attached
+        if r is None:
+            if self.pool is not None:
+                return self.pool.get()
+            r = random.randint(1, self.n - 1)
+        return powmod(r, self.n, self.n_sq)
+
+    def encrypt(self, message, r=None):
+        self.count += 1
+        encryption_path_counts[self.path] += 1
+        with instrumentation.stage("encrypt"):
+            return mulmod(self.raw_encrypt(message), self.obfuscator(r), self.n_sq)
+
+
+# Encrypt the message using the public key
+def encrypt(message, public_key, pool=None):
+    return Encryptor(public_key, pool).encrypt(message)
+
+# Decrypt a (possibly masked) ciphertext
+def decrypt(ciphertext, private_key, public_key):
+    with instrumentation.stage("decrypt"):
+        return _decrypt(ciphertext, private_key, public_key)
+
+# Only a PrivateKeyCRT carries n; a plain (lambda_n, mu) key needs the public key alongside
+def check_decryption_key(private_key, public_key):
+    if public_key is None and not isinstance(private_key, PrivateKeyCRT):
+        raise ValueError("Decrypting with a (lambda_n, mu) private key needs the public key; "
+                         "pass public_key or use a PrivateKeyCRT")
+
+def _decrypt(ciphertext, private_key, public_key):
+    if isinstance(private_key, PrivateKeyCRT):
+        return private_key.decrypt(ciphertext)
+
+    check_decryption_key(private_key, public_key)
+    n, _ = public_key
+    lambda_n, mu = private_key
+    n_sq = n * n
+
+    def L(x):
+        return (x - 1) // n
+
+    u = powmod(ciphertext, lambda_n, n_sq)
+    l = L(u)
+    message = (l * mu) % n
+    return message
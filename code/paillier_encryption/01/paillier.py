@@ -1,11 +1,11 @@
 import random
-from sympy import isprime, mod_inverse
+from sympy import mod_inverse
+import os
+import sys
 
-def generate_prime(bits):
-    while True:
-        prime_candidate = random.getrandbits(bits)
-        if isprime(prime_candidate):
-            return prime_candidate
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from primes import generate_prime
 
 def generate_keypair(bits=512):
     p = generate_prime(bits // 2)
@@ -1,15 +1,15 @@
 import random
 import time
-from sympy import isprime, mod_inverse
 from Crypto.Util import number
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
 
-def generate_prime(bits):
-    while True:
-        prime_candidate = random.getrandbits(bits)
-        if isprime(prime_candidate):
-            return prime_candidate
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bigint_backend import powmod, invert, mulmod
+from primes import generate_prime
 
 def generate_keypair_paillier(bits=512):
     print(f"Generating Paillier key pair with {bits}-bit keys...")
@@ -20,7 +20,7 @@ def generate_keypair_paillier(bits=512):
     n = p * q
     lambda_n = (p - 1) * (q - 1)
     g = n + 1
-    mu = mod_inverse(lambda_n, n)
+    mu = invert(lambda_n, n)
     
     public_key = (n, g)
     private_key = (lambda_n, mu)
@@ -40,7 +40,7 @@ def generate_keypair_rsa(bits=512):
     n = p * q
     lambda_n = (p - 1) * (q - 1)
     e = 65537
-    d = number.inverse(e, lambda_n)
+    d = invert(e, lambda_n)
     
     public_key = (n, e)
     private_key = (d, lambda_n)
@@ -57,7 +57,7 @@ def encrypt_paillier(message, public_key):
     n, g = public_key
     r = random.randint(1, n-1)
     n_sq = n * n
-    c = (pow(g, message, n_sq) * pow(r, n, n_sq)) % n_sq
+    c = mulmod(powmod(g, message, n_sq), powmod(r, n, n_sq), n_sq)
     
     end_time = time.time()
     encryption_time = end_time - start_time
@@ -74,7 +74,7 @@ def decrypt_paillier(ciphertext, private_key, public_key):
     def L(x):
         return (x - 1) // n
 
-    u = pow(ciphertext, lambda_n, n_sq)
+    u = powmod(ciphertext, lambda_n, n_sq)
     l = L(u)
     message = (l * mu) % n
     
@@ -87,7 +87,7 @@ def encrypt_rsa(message, public_key):
     start_time = time.time()
     
     n, e = public_key
-    ciphertext = pow(message, e, n)
+    ciphertext = powmod(message, e, n)
     
     end_time = time.time()
     encryption_time = end_time - start_time
@@ -99,7 +99,7 @@ def decrypt_rsa(ciphertext, private_key, public_key):
     
     n, e = public_key
     d, _ = private_key
-    message = pow(ciphertext, d, n)
+    message = powmod(ciphertext, d, n)
     
     end_time = time.time()
     decryption_time = end_time - start_time
@@ -1,23 +1,25 @@
 import random
 import time
-from sympy import isprime, mod_inverse, gcd
+from sympy import gcd
 import matplotlib.pyplot as plt
 import numpy as np
 import math
+import os
+import sys
 
-# Paillier Cryptosystem
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-def generate_prime(bits):
-    while True:
-        prime_candidate = random.getrandbits(bits)
-        if isprime(prime_candidate):
-            return prime_candidate
+from paillier_core import encrypt
+from bigint_backend import powmod, invert, mulmod
+from primes import generate_prime
+
+# Paillier Cryptosystem
 
 def find_valid_g(n, lambda_n):
     n_sq = n * n
     while True:
         g = random.randint(1, n_sq - 1)
-        if gcd((pow(g, lambda_n, n_sq) - 1) // n, n) == 1:
+        if gcd((powmod(g, lambda_n, n_sq) - 1) // n, n) == 1:
             return g
 
 def paillier_generate_keypair(bits=512):  
@@ -26,17 +28,14 @@ def paillier_generate_keypair(bits=512):
     n = p * q
     lambda_n = (p - 1) * (q - 1)
     g = find_valid_g(n, lambda_n)
-    mu = mod_inverse((pow(g, lambda_n, n * n) - 1) // n, n)
+    mu = invert((powmod(g, lambda_n, n * n) - 1) // n, n)
     public_key = (n, g)
     private_key = (lambda_n, mu)
     return public_key, private_key
 
 def paillier_encrypt(message, public_key):
-    n, g = public_key
-    r = random.randint(1, n - 1)
-    n_sq = n * n
-    c = (pow(g, message, n_sq) * pow(r, n, n_sq)) % n_sq
-    return c
+    # Random-g keys take the general g^m path of the shared encryptor
+    return encrypt(message, public_key)
 
 def paillier_decrypt(ciphertext, private_key, public_key):
     n, _ = public_key
@@ -46,7 +45,7 @@ def paillier_decrypt(ciphertext, private_key, public_key):
     def L(x):
         return (x - 1) // n
 
-    u = pow(ciphertext, lambda_n, n_sq)
+    u = powmod(ciphertext, lambda_n, n_sq)
     l = L(u)
     message = (l * mu) % n
     return message
@@ -54,7 +53,7 @@ def paillier_decrypt(ciphertext, private_key, public_key):
 def paillier_homomorphic_addition(c1, c2, public_key):
     n, _ = public_key
     n_sq = n * n
-    c_sum = (c1 * c2) % n_sq
+    c_sum = mulmod(c1, c2, n_sq)
     return c_sum
 
 # RSA Cryptosystem
@@ -69,7 +68,7 @@ def rsa_generate_keypair(bits=512):
     while math.gcd(e, phi) != 1:
         e = random.randint(2, phi - 1)
     
-    d = mod_inverse(e, phi)
+    d = invert(e, phi)
     
     public_key = (e, n)
     private_key = (d, n)
@@ -78,12 +77,12 @@ def rsa_generate_keypair(bits=512):
 
 def rsa_encrypt(message, public_key):
     e, n = public_key
-    ciphertext = pow(message, e, n)
+    ciphertext = powmod(message, e, n)
     return ciphertext
 
 def rsa_decrypt(ciphertext, private_key):
     d, n = private_key
-    message = pow(ciphertext, d, n)
+    message = powmod(ciphertext, d, n)
     return message
 
 # Performance Comparison
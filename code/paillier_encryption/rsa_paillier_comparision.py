@@ -1,24 +1,25 @@
 import random
 import time
-from sympy import isprime, mod_inverse, gcd
+from sympy import gcd
 import matplotlib.pyplot as plt
 import numpy as np
 import math
+import os
+import sys
 
-# Paillier Cryptosystem
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-def generate_prime(bits):
-    while True:
-        prime_candidate = random.getrandbits(bits)
-        if isprime(prime_candidate):
-            return prime_candidate
+from bigint_backend import powmod, invert, mulmod
+from primes import generate_prime
+
+# Paillier Cryptosystem
 
 def find_valid_g(n, lambda_n):
     n_sq = n * n
     while True:
         g = random.randint(1, n_sq - 1)
         # Check if L(g^lambda mod n^2) is invertible mod n
-        if gcd((pow(g, lambda_n, n_sq) - 1) // n, n) == 1:
+        if gcd((powmod(g, lambda_n, n_sq) - 1) // n, n) == 1:
             return g
 
 def paillier_generate_keypair(bits=512):
@@ -30,7 +31,7 @@ def paillier_generate_keypair(bits=512):
     # Find a valid g using the verification approach
     g = find_valid_g(n, lambda_n)
     
-    mu = mod_inverse((pow(g, lambda_n, n * n) - 1) // n, n)
+    mu = invert((powmod(g, lambda_n, n * n) - 1) // n, n)
     
     public_key = (n, g)
     private_key = (lambda_n, mu)
@@ -41,7 +42,7 @@ def paillier_encrypt(message, public_key):
     n, g = public_key
     r = random.randint(1, n-1)
     n_sq = n * n
-    c = (pow(g, message, n_sq) * pow(r, n, n_sq)) % n_sq
+    c = mulmod(powmod(g, message, n_sq), powmod(r, n, n_sq), n_sq)
     return c
 
 def paillier_decrypt(ciphertext, private_key, public_key):
@@ -52,7 +53,7 @@ def paillier_decrypt(ciphertext, private_key, public_key):
     def L(x):
         return (x - 1) // n
 
-    u = pow(ciphertext, lambda_n, n_sq)
+    u = powmod(ciphertext, lambda_n, n_sq)
     l = L(u)
     message = (l * mu) % n
     return message
@@ -60,7 +61,7 @@ def paillier_decrypt(ciphertext, private_key, public_key):
 def paillier_homomorphic_addition(c1, c2, public_key):
     n, _ = public_key
     n_sq = n * n
-    c_sum = (c1 * c2) % n_sq
+    c_sum = mulmod(c1, c2, n_sq)
     return c_sum
 
 # RSA Cryptosystem
@@ -75,7 +76,7 @@ def rsa_generate_keypair(bits=512):
     while math.gcd(e, phi) != 1:
         e = random.randint(2, phi - 1)
     
-    d = mod_inverse(e, phi)
+    d = invert(e, phi)
     
     public_key = (e, n)
     private_key = (d, n)
@@ -84,17 +85,17 @@ def rsa_generate_keypair(bits=512):
 
 def rsa_encrypt(message, public_key):
     e, n = public_key
-    ciphertext = pow(message, e, n)
+    ciphertext = powmod(message, e, n)
     return ciphertext
 
 def rsa_decrypt(ciphertext, private_key):
     d, n = private_key
-    message = pow(ciphertext, d, n)
+    message = powmod(ciphertext, d, n)
     return message
 
 def rsa_homomorphic_multiplication(c1, c2, public_key):
     _, n = public_key
-    return (c1 * c2) % n
+    return mulmod(c1, c2, n)
 
 # Performance Comparison
 
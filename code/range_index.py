@@ -0,0 +1,98 @@
+import numbers
+from bisect import bisect_left, bisect_right
+from bigint_backend import invert, mulmod
+from ciphertext_file import CiphertextReader, CiphertextWriter
+from aggregation import EncryptedAggregate
+
+
+class RangeSumIndex:
+    """Fenwick tree of encrypted partial sums over an append-only series.
+
+    Node i holds the product (encrypted sum) of readings (i - lowbit(i), i],
+    so any prefix is the product of O(log n) nodes and any range is one
+    prefix divided by another. Appending only creates the new node, so the
+    index grows incrementally alongside the stored readings. Timestamps
+    are non-negative integers below 2**64 (they are saved as unsigned
+    64-bit row ids) and must be non-decreasing; they default to the
+    reading's position.
+    """
+
+    def __init__(self, public_key):
+        n, _ = public_key
+        self.public_key = public_key
+        self.n_sq = n * n
+        self.tree = [1]  # 1-based; tree[0] is unused
+        self.timestamps = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, ciphertext, timestamp=None):
+        i = len(self.timestamps) + 1
+        if timestamp is None:
+            timestamp = i - 1
+        if isinstance(timestamp, bool) or not isinstance(timestamp, numbers.Integral) \
+                or not 0 <= timestamp < 1 << 64:
+            raise ValueError(f"Timestamps must be integers in [0, 2**64), got {timestamp!r}")
+        timestamp = int(timestamp)
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            raise ValueError("Timestamps must be appended in non-decreasing order")
+        # Fold in the nodes that cover (i - lowbit(i), i - 1]
+        node = ciphertext
+        j = i - 1
+        stop = i - (i & -i)
+        while j > stop:
+            node = mulmod(node, self.tree[j], self.n_sq)
+            j -= j & -j
+        self.tree.append(node)
+        self.timestamps.append(timestamp)
+
+    def extend(self, ciphertexts, timestamps=None):
+        if timestamps is None:
+            for ciphertext in ciphertexts:
+                self.append(ciphertext)
+        else:
+            for ciphertext, timestamp in zip(ciphertexts, timestamps):
+                self.append(ciphertext, timestamp)
+
+    # Encrypted sum of the first `count` readings
+    def prefix_sum(self, count):
+        product = 1
+        while count > 0:
+            product = mulmod(product, self.tree[count], self.n_sq)
+            count -= count & -count
+        return product
+
+    # Encrypted sum of readings at positions [start, stop)
+    def range_sum(self, start, stop):
+        if not 0 <= start <= stop <= len(self):
+            raise IndexError(f"Range [{start}, {stop}) outside index of {len(self)} readings")
+        upper = self.prefix_sum(stop)
+        if start == 0:
+            return upper
+        # E(a)^-1 is E(-a), so dividing prefixes subtracts them
+        return mulmod(upper, invert(self.prefix_sum(start), self.n_sq), self.n_sq)
+
+    def time_range(self, t1, t2):
+        """Encrypted SUM and COUNT of readings with t1 <= timestamp <= t2."""
+        start = bisect_left(self.timestamps, t1)
+        stop = bisect_right(self.timestamps, t2)
+        stop = max(start, stop)
+        return EncryptedAggregate(self.range_sum(start, stop), stop - start)
+
+    def time_range_mean(self, t1, t2, private_key):
+        return self.time_range(t1, t2).mean(private_key, self.public_key)
+
+    # The tree nodes are stored as a ciphertext file, with timestamps in the row-id column
+    def save(self, path):
+        with CiphertextWriter(path, self.public_key, with_row_ids=True) as writer:
+            writer.write_many(self.tree[1:], self.timestamps)
+
+    @classmethod
+    def load(cls, path, public_key):
+        index = cls(public_key)
+        with CiphertextReader(path) as reader:
+            reader.check_key(public_key)
+            index.tree.extend(reader)
+            index.timestamps = [reader.row_id(i) for i in range(len(reader))]
+        return index
@@ -3,10 +3,12 @@ import time
 import logging
 import sys
 import math
+import os
 import matplotlib.pyplot as plt
-from sympy import isprime
 
-sys.setrecursionlimit(10000)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bigint_backend import powmod, invert, is_prime, mulmod
 
 def generate_prime(bits):
     start_prime_gen = time.time()
@@ -14,25 +16,15 @@ def generate_prime(bits):
         prime_candidate = random.getrandbits(bits)
         if prime_candidate % 2 == 0:  
             prime_candidate += 1
-        if isprime(prime_candidate):
+        if is_prime(prime_candidate):
             end_prime_gen = time.time()
             return prime_candidate, end_prime_gen - start_prime_gen
 
-# Extended Euclidean algorithm to find the GCD and modular inverse
-def egcd(a, b):
-    if a == 0:
-        return b, 0, 1
-    gcd, x1, y1 = egcd(b % a, a)
-    x = y1 - (b // a) * x1
-    y = x1
-    return gcd, x, y
-
-# Function to compute the modular inverse
+# Function to compute the modular inverse (through the big-integer backend)
 def mod_inverse(e, phi):
-    gcd, x, y = egcd(e, phi)
-    if gcd != 1:
+    if math.gcd(e, phi) != 1:
         raise ValueError("mod_inverse does not exist")
-    return x % phi
+    return invert(e, phi)
 
 # Function to generate RSA key pair
 def generate_keypair(bits):
@@ -73,7 +65,7 @@ def generate_keypair(bits):
 def encrypt(plaintext, public_key):
     num = int(plaintext)  # Ensure plaintext is an integer
     start_crypto = time.time()
-    ciphertext = pow(num, public_key[0], public_key[1])
+    ciphertext = powmod(num, public_key[0], public_key[1])
     end_crypto = time.time()
     crypto_time = end_crypto - start_crypto
     logging.info(f"Time for encryption: {crypto_time} seconds")
@@ -82,7 +74,7 @@ def encrypt(plaintext, public_key):
 # Function to decrypt a ciphertext using the private key
 def decrypt(ciphertext, private_key):
     start_crypto = time.time()
-    num = pow(ciphertext, private_key[0], private_key[1])
+    num = powmod(ciphertext, private_key[0], private_key[1])
     end_crypto = time.time()
     crypto_time = end_crypto - start_crypto
     logging.info(f"Time for decryption: {crypto_time} seconds")
@@ -91,7 +83,7 @@ def decrypt(ciphertext, private_key):
 # Function for homomorphic multiplication
 def homomorphic_multiply(ciphertext1, ciphertext2, n):
     # Homomorphic multiplication in the ciphertext domain
-    return (ciphertext1 * ciphertext2) % n
+    return mulmod(ciphertext1, ciphertext2, n)
 
 # Function to plot times for key generation, prime generation, encryption, and decryption
 def plot_times(key_gen_time, prime_gen_time, encryption_time, decryption_time):
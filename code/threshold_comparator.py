@@ -0,0 +1,59 @@
+from bigint_backend import powmod, invert, mulmod
+from paillier_core import Encryptor, decrypt
+from paillier_batch import encrypt_many, decrypt_many
+import instrumentation
+
+
+class ThresholdComparator:
+    """Compare encrypted readings against a fixed threshold.
+
+    Works like the loop in blood_oxygen_level.py: the masked threshold is
+    divided by the masked reading, and the bit length of the decrypted
+    difference power * (threshold - value) mod n tells the two apart. All
+    per-key and per-threshold constants are computed once here.
+    """
+
+    def __init__(self, public_key, private_key, threshold, power=8):
+        self.public_key = public_key
+        self.private_key = private_key
+        self.threshold = threshold
+        self.power = power
+
+        n, _ = public_key
+        self.n_sq = n * n
+        self.compare_condition = n.bit_length() / 2
+        self.encryptor = Encryptor(public_key)
+
+        # The threshold is encrypted and masked once, not once per reading
+        self.masked_threshold = powmod(self.encryptor.encrypt(threshold), power, self.n_sq)
+
+    def masked_difference(self, ciphertext):
+        # E(m)^-1 is E(-m); invert() is far cheaper than the old pow(x, n - 1, n^2),
+        # and masking the inverse only needs the small power
+        with instrumentation.stage("subtract"):
+            inverse = invert(ciphertext, self.n_sq)
+        with instrumentation.stage("mask"):
+            return mulmod(self.masked_threshold, powmod(inverse, self.power, self.n_sq), self.n_sq)
+
+    # Label a decrypted difference relative to the threshold
+    def label(self, decrypted_difference):
+        with instrumentation.stage("classify"):
+            bits = decrypted_difference.bit_length()
+            if bits == 0:
+                return "equal"
+            if bits < self.compare_condition:
+                return "less"
+            return "greater"
+
+    def classify_ciphertext(self, ciphertext):
+        difference = decrypt(self.masked_difference(ciphertext), self.private_key, self.public_key)
+        return self.label(difference)
+
+    def classify(self, value):
+        return self.classify_ciphertext(self.encryptor.encrypt(value))
+
+    def classify_many(self, values, workers=None):
+        ciphertexts = encrypt_many(values, self.public_key, workers=workers)
+        differences = [self.masked_difference(c) for c in ciphertexts]
+        decrypted = decrypt_many(differences, self.private_key, self.public_key, workers=workers)
+        return [self.label(d) for d in decrypted]
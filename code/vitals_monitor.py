@@ -0,0 +1,73 @@
+from collections import deque
+from bigint_backend import invert, mulmod
+from aggregation import EncryptedAggregate
+from threshold_comparator import ThresholdComparator
+
+
+class SlidingWindowMonitor:
+    """Encrypted running sum over the last ``window_size`` readings of a stream.
+
+    Each update multiplies in the new ciphertext and multiplies out the
+    expired one (via its inverse), so it costs O(1) ciphertext operations
+    whatever the window size. Every ``emit_every`` updates, once the window
+    is full, the encrypted window sum and count are emitted as an
+    EncryptedAggregate, returned and passed to ``on_emit`` if given.
+    """
+
+    def __init__(self, public_key, window_size, emit_every=1, on_emit=None):
+        if window_size < 1 or emit_every < 1:
+            raise ValueError("window_size and emit_every must be at least 1")
+        n, _ = public_key
+        self.public_key = public_key
+        self.n_sq = n * n
+        self.window_size = window_size
+        self.emit_every = emit_every
+        self.on_emit = on_emit
+
+        self.window = deque()
+        self.running_sum = 1  # E(0) with r = 1
+        self.updates = 0
+
+    def update(self, ciphertext):
+        self.running_sum = mulmod(self.running_sum, ciphertext, self.n_sq)
+        self.window.append(ciphertext)
+        if len(self.window) > self.window_size:
+            expired = self.window.popleft()
+            self.running_sum = mulmod(self.running_sum, invert(expired, self.n_sq), self.n_sq)
+        self.updates += 1
+
+        if len(self.window) == self.window_size and self.updates % self.emit_every == 0:
+            aggregate = EncryptedAggregate(self.running_sum, self.window_size)
+            if self.on_emit is not None:
+                self.on_emit(aggregate)
+            return aggregate
+        return None
+
+    def window_comparator(self, private_key, threshold, power=8):
+        """Comparator for full-window sums against a per-reading mean threshold.
+
+        The mean is below the threshold exactly when the sum is below
+        threshold * window_size, so emitted sums can be classified with
+        ``classify_ciphertext(aggregate.sum_ciphertext)`` without decrypting
+        the mean itself.
+        """
+        return ThresholdComparator(self.public_key, private_key, threshold * self.window_size, power)
+
+
+if __name__ == "__main__":
+    from paillier_core import generate_keypair, Encryptor
+    from csv_stream import CSVStream
+
+    public_key, private_key = generate_keypair(bits=1024)
+    encryptor = Encryptor(public_key)
+    monitor = SlidingWindowMonitor(public_key, window_size=60, emit_every=30)
+    comparator = monitor.window_comparator(private_key, threshold=90)
+
+    # Replay the SpO2 sample as a bedside stream
+    for reading in CSVStream('input.csv', max_entries=600):
+        aggregate = monitor.update(encryptor.encrypt(reading))
+        if aggregate is not None:
+            # The window sum is compared against 90 * window_size, so "less" means a mean below 90
+            status = comparator.classify_ciphertext(aggregate.sum_ciphertext)
+            print(f"Reading {monitor.updates}: window mean {aggregate.mean(private_key):.2f}, "
+                  f"{'below' if status == 'less' else 'at or above'} 90")